@@ -0,0 +1,187 @@
+import argparse
+import math
+import os
+import numpy as np
+import pandas as pd
+
+BASE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ZIP_SHAPE_FILE_NAME = 'City_of_Los_Angeles_Zip_Codes.shp'
+COUNTY_FIPS = '06037'
+
+# raw data folder -> (file prefix, ACS table, estimate column codes)
+ACS_TABLE_DICT = {
+    '02_income': ('ACSST5Y', 'S1903', [f'S1903_C02_{i:03d}E' for i in range(1, 28)]),
+    '03_poverty': ('ACSST5Y', 'S1701', [f'S1701_C02_{i:03d}E' for i in range(1, 17)]),
+    '04_employment': ('ACSST5Y', 'S2301', [f'S2301_C04_{i:03d}E' for i in range(1, 22)] + [f'S2301_C02_{i:03d}E' for i in range(14, 17)]),
+    '05_rent': ('ACSDT5Y', 'B25064', ['B25064_001E']),
+    '06_tenure': ('ACSDT5Y', 'B25003', [f'B25003_{i:03d}E' for i in range(1, 4)]),
+    '07_age_sex': ('ACSDT5Y', 'B01001', [f'B01001_{i:03d}E' for i in range(1, 50)]),
+    '08_ethnicity': ('ACSDT5Y', 'B03002', [f'B03002_{i:03d}E' for i in range(1, 20)])
+}
+
+HOMELESS_COUNT_COLUMN_LIST = ['total cars', 'total vans', 'total campers or rvs', 'total tents', 'total homeless individuals']
+VICTIM_DESCENT_LIST = ['W', 'B', 'H', 'C', 'J', 'K', 'V', 'Z', 'F', 'A', 'I', 'D', 'G', 'L', 'P', 'S', 'U', 'O', 'X', '-']
+VICTIM_SEX_LIST = ['M', 'F', 'X']
+
+
+def zip_code_list_of(total_zip_codes: int) -> list[str]:
+    if total_zip_codes > 9998:
+        raise ValueError(f'At most 9998 synthetic ZIP codes are supported, got {total_zip_codes}')
+    return [f'{90001 + i:05d}' for i in range(total_zip_codes)]
+
+
+def zip_code_bounds_of(total_zip_codes: int, cell_size: float = 0.02) -> np.ndarray:
+    # (min_lon, min_lat, max_lon, max_lat) of a square grid of cells centered around Los Angeles
+    grid_width = math.ceil(math.sqrt(total_zip_codes))
+    cell_idx = np.arange(total_zip_codes)
+    min_lon = -118.7 + (cell_idx % grid_width) * cell_size
+    min_lat = 33.7 + (cell_idx // grid_width) * cell_size
+    return np.column_stack([min_lon, min_lat, min_lon + cell_size, min_lat + cell_size])
+
+
+def generate_shape_file(data_root: str, zip_code_list: list[str]) -> None:
+    import geopandas as gpd
+    from shapely.geometry import box
+
+    bounds = zip_code_bounds_of(len(zip_code_list))
+    zip_gdf = gpd.GeoDataFrame({'ZCTA5CE10': zip_code_list}, geometry=[box(*row) for row in bounds], crs='EPSG:4326')
+    zip_folder_path = os.path.join(data_root, 'utility', 'shape_files')
+    os.makedirs(zip_folder_path, exist_ok=True)
+    zip_gdf.to_file(os.path.join(zip_folder_path, ZIP_SHAPE_FILE_NAME))
+
+
+def generate_crosswalk(data_root: str, zip_code_list: list[str], year_list: list[int], tracts_per_zip: int, rng: np.random.Generator) -> pd.DataFrame:
+    tract_list = [f'{COUNTY_FIPS}{100000 + i * tracts_per_zip + j:06d}' for i in range(len(zip_code_list)) for j in range(tracts_per_zip)]
+    base_cross_df = pd.DataFrame({
+        'zip_code': np.repeat(zip_code_list, tracts_per_zip),
+        'tract': tract_list
+    })
+    cross_df_list = list[pd.DataFrame]()
+    for year in [year_list[0] - 1] + year_list:
+        for month in ['03', '06', '09', '12']:
+            # Every quarter misses a few tracts so the maximal-coverage quarter search has work to do
+            keep_mask = rng.random(base_cross_df.shape[0]) > 0.02
+            cross_df_list.append(base_cross_df[keep_mask].assign(quarter=f'{year}_{month}'))
+    cross_df = pd.concat(cross_df_list, ignore_index=True)[['quarter', 'zip_code', 'tract']]
+    # The HUD workbooks filter_crosswalk.py reads (ZIP_TRACT_MMYYYY.xlsx), plus the filtered crosswalk.csv it
+    # would write, so the transforms can also be benchmarked on their own
+    raw_folder_path = os.path.join(data_root, 'raw', 'crosswalk')
+    os.makedirs(raw_folder_path, exist_ok=True)
+    for quarter, quarter_df in cross_df.groupby('quarter', sort=False):
+        workbook_df = pd.DataFrame({
+            'ZIP': quarter_df['zip_code'].astype(int).values,
+            'TRACT': quarter_df['tract'].values,
+            'RES_RATIO': rng.random(quarter_df.shape[0]).round(6)
+        })
+        workbook_df.to_excel(os.path.join(raw_folder_path, f'ZIP_TRACT_{quarter[5:]}{quarter[:4]}.xlsx'), index=False)
+    cross_folder_path = os.path.join(data_root, 'utility', 'crosswalk_files')
+    os.makedirs(cross_folder_path, exist_ok=True)
+    cross_df.to_csv(os.path.join(cross_folder_path, 'crosswalk.csv'), index=False)
+    return base_cross_df
+
+
+def generate_homeless_counts(data_root: str, base_cross_df: pd.DataFrame, year_list: list[int], rng: np.random.Generator) -> None:
+    # Each ZIP code's count follows a log-level whose yearly change persists (AR(1) around an upward drift), so
+    # whether it rises is predictable from its recent history and, as in the real counts, rises outnumber falls:
+    # the search's low learning rates keep probabilities near the base rate, so a minority positive class would
+    # leave every trial predicting all-negative
+    count_folder_path = os.path.join(data_root, 'utility', 'homeless_count_files')
+    os.makedirs(count_folder_path, exist_ok=True)
+    zip_code_idx, zip_code_list = pd.factorize(base_cross_df['zip_code'])
+    tracts_per_zip = np.bincount(zip_code_idx)[zip_code_idx]
+    log_level = rng.normal(np.log(400.0), 0.3, len(zip_code_list))
+    log_change = rng.normal(0.05, 0.15, len(zip_code_list))
+    for year in year_list:
+        log_change = 0.05 + 0.8 * (log_change - 0.05) + rng.normal(0.0, 0.05, len(zip_code_list))
+        log_level = log_level + log_change
+        tract_mean = np.exp(log_level)[zip_code_idx] / tracts_per_zip
+        count_df = pd.DataFrame({'tract': base_cross_df['tract'].str[len(COUNTY_FIPS):]})
+        for column in HOMELESS_COUNT_COLUMN_LIST:
+            count_df[column] = rng.poisson(tract_mean * (1.0 if column == 'total homeless individuals' else 0.2))
+        count_df.to_csv(os.path.join(count_folder_path, f'{year}.csv'), index=False, encoding='utf-8-sig')
+
+
+def generate_acs(data_root: str, zip_code_list: list[str], year_list: list[int], extra_zip_codes: int, rng: np.random.Generator) -> None:
+    # ZCTAs outside the region are included so "Local Filtering" discards a realistic share of rows
+    all_zip_code_list = zip_code_list + [f'{10001 + i:05d}' for i in range(extra_zip_codes)]
+    for dataset_name, (file_prefix, table_name, column_list) in ACS_TABLE_DICT.items():
+        raw_folder_path = os.path.join(data_root, 'raw', dataset_name)
+        os.makedirs(raw_folder_path, exist_ok=True)
+        for year in year_list:
+            estimate_values = rng.lognormal(mean=8.0, sigma=1.0, size=(len(all_zip_code_list), len(column_list))).round(1)
+            raw_df = pd.DataFrame({
+                'GEO_ID': [f'860Z200US{zip_code}' for zip_code in all_zip_code_list],
+                'NAME': [f'ZCTA5 {zip_code}' for zip_code in all_zip_code_list]
+            })
+            for k, column in enumerate(column_list):
+                raw_df[column] = estimate_values[:, k]
+                raw_df[column[:-1] + 'M'] = (estimate_values[:, k] * 0.1).round(1)
+            label_df = pd.DataFrame([{column: f'Label for {column}' for column in raw_df.columns}])
+            raw_df = pd.concat([label_df, raw_df.astype(str)], ignore_index=True)
+            raw_df.to_csv(os.path.join(raw_folder_path, f'{file_prefix}{year}.{table_name}-Data.csv'), index=False)
+
+
+def generate_crime(data_root: str, zip_code_list: list[str], year_list: list[int], crime_rows_per_year: int, rng: np.random.Generator) -> None:
+    bounds = zip_code_bounds_of(len(zip_code_list))
+    raw_folder_path = os.path.join(data_root, 'raw', '09_crime')
+    os.makedirs(raw_folder_path, exist_ok=True)
+    for year in year_list:
+        cell_idx = rng.integers(0, len(zip_code_list), crime_rows_per_year)
+        cell_offsets = rng.random((crime_rows_per_year, 2))
+        lon = bounds[cell_idx, 0] + cell_offsets[:, 0] * (bounds[cell_idx, 2] - bounds[cell_idx, 0])
+        lat = bounds[cell_idx, 1] + cell_offsets[:, 1] * (bounds[cell_idx, 3] - bounds[cell_idx, 1])
+        missing_mask = rng.random(crime_rows_per_year) < 0.01
+        lon[missing_mask] = 0.0
+        lat[missing_mask] = 0.0
+        reported_dates = pd.Timestamp(f'{year}-01-01') + pd.to_timedelta(rng.integers(0, 365, crime_rows_per_year), unit='D')
+        raw_df = pd.DataFrame({
+            'DR_NO': year * 10_000_000 + np.arange(crime_rows_per_year),
+            'Date Rptd': reported_dates.strftime('%m/%d/%Y %I:%M:%S %p'),
+            'LAT': lat.round(4),
+            'LON': lon.round(4),
+            'Vict Age': rng.integers(-1, 90, crime_rows_per_year),
+            'Vict Sex': rng.choice(VICTIM_SEX_LIST, crime_rows_per_year),
+            'Vict Descent': rng.choice(VICTIM_DESCENT_LIST, crime_rows_per_year)
+        })
+        raw_df.to_csv(os.path.join(raw_folder_path, f'crime_{year}.csv'), index=False)
+
+
+def generate(base_root: str, total_zip_codes: int, total_years: int, tracts_per_zip: int, crime_rows_per_year: int, first_year: int = 2011, seed: int = 42) -> None:
+    rng = np.random.default_rng(seed)
+    data_root = os.path.join(base_root, 'data')
+    zip_code_list = zip_code_list_of(total_zip_codes)
+    year_list = list(range(first_year, first_year + total_years))
+
+    print('== Shape File ==')
+    generate_shape_file(data_root, zip_code_list)
+
+    print('== Crosswalk ==')
+    base_cross_df = generate_crosswalk(data_root, zip_code_list, year_list, tracts_per_zip, rng)
+
+    print('== Homeless Counts ==')
+    generate_homeless_counts(data_root, base_cross_df, year_list, rng)
+
+    print('== ACS ==')
+    generate_acs(data_root, zip_code_list, year_list, total_zip_codes, rng)
+
+    print('== Crime ==')
+    generate_crime(data_root, zip_code_list, year_list, crime_rows_per_year, rng)
+
+    for folder_name in ['transformed', 'prepared']:
+        os.makedirs(os.path.join(data_root, folder_name), exist_ok=True)
+    os.makedirs(os.path.join(base_root, 'models'), exist_ok=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a schema-faithful synthetic data tree for the pipeline.')
+    parser.add_argument('output_root', help='Folder receiving data/ and models/ (never the repository itself)')
+    parser.add_argument('--zip-codes', type=int, default=133)
+    parser.add_argument('--years', type=int, default=12)
+    parser.add_argument('--tracts-per-zip', type=int, default=16)
+    parser.add_argument('--crime-rows-per-year', type=int, default=200_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    if os.path.abspath(args.output_root) == BASE_ROOT:
+        parser.error('Refusing to overwrite the repository data with synthetic data')
+    generate(args.output_root, args.zip_codes, args.years, args.tracts_per_zip, args.crime_rows_per_year, seed=args.seed)
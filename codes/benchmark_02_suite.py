@@ -0,0 +1,231 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import resource
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import utility_trace
+
+BASE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODES_ROOT = os.path.join(BASE_ROOT, 'codes')
+BENCHMARK_DATA_FOLDER_PATH = os.path.join(BASE_ROOT, 'data', 'benchmark')
+
+STAGE_SCRIPT_LIST = [
+    'filter_crosswalk.py',
+    'transform_01_homeless_count.py',
+    'transform_02_income.py',
+    'transform_03_poverty.py',
+    'transform_04_employment.py',
+    'transform_05_rent.py',
+    'transform_06_tenure.py',
+    'transform_07_age_sex.py',
+    'transform_08_ethnicity.py',
+    'transform_09_crime.py',
+    'prepare_01_merge.py',
+    'prepare_02_filter.py',
+    'prepare_03_clean.py',
+    'prepare_04_debias.py',
+    'model_xgboost.py',
+    'bias_management.py'
+]
+
+
+def run_stage_in_process(script_path: str, total_trials: int, trace_memory: bool) -> dict:
+    # Runs inside the child process: executes the stage script unchanged and measures it from the outside
+    trial_list = list[dict[str, float]]()
+    sys.path.insert(0, os.path.dirname(script_path))
+    if os.path.basename(script_path) == 'model_xgboost.py':
+        import skopt
+
+        # fit_fold times its own boosting, also when the folds run in worker processes; the fit time of a trial is
+        # summed over its folds, and the features/scoring time is what the trial spends outside utility_validation.fit_folds
+        import utility_validation
+
+        fit_seconds = [0.0, 0.0]    # Summed fold fit time, wall time in fit_folds
+        original_fit_folds = utility_validation.fit_folds
+        def timed_fit_folds(*args, **kwargs):
+            start = time.perf_counter()
+            fold_result_list = original_fit_folds(*args, **kwargs)
+            fit_seconds[0] += sum(fold_result[-1] for fold_result in fold_result_list)
+            fit_seconds[1] += time.perf_counter() - start
+            return fold_result_list
+        utility_validation.fit_folds = timed_fit_folds
+
+        original_gp_minimize = skopt.gp_minimize
+        def timed_gp_minimize(func, dimensions, **kwargs):
+            def timed_func(params):
+                fit_seconds[:] = [0.0, 0.0]
+                start = time.perf_counter()
+                value = func(params)
+                trial_seconds = time.perf_counter() - start
+                trial_list.append({
+                    'total_lags': int(params[0]),
+                    'trial_seconds': trial_seconds,
+                    'fit_seconds': fit_seconds[0],
+                    'feature_and_scoring_seconds': trial_seconds - fit_seconds[1]
+                })
+                return value
+            kwargs['n_calls'] = total_trials
+            kwargs['n_random_starts'] = min(kwargs.get('n_random_starts', total_trials), total_trials)
+            return original_gp_minimize(timed_func, dimensions, **kwargs)
+        skopt.gp_minimize = timed_gp_minimize
+
+    if trace_memory:
+        tracemalloc.start()
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    start_children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    runpy.run_path(script_path, run_name='__main__')
+    # Worker processes (e.g. parallel folds) only count once they have exited, so the pools are shut down first
+    if 'utility_validation' in sys.modules:
+        sys.modules['utility_validation'].shutdown_executors()
+    wall_seconds = time.perf_counter() - start_wall
+    children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    children_cpu_seconds = (children_usage.ru_utime - start_children_usage.ru_utime) + (children_usage.ru_stime - start_children_usage.ru_stime)
+    result = {
+        'wall_seconds': wall_seconds,
+        'cpu_seconds': time.process_time() - start_cpu + children_cpu_seconds,
+        'peak_rss_mb': utility_trace.peak_rss_mb()
+    }
+    if trace_memory:
+        result['peak_traced_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    if trial_list:
+        result['trials'] = trial_list
+    return result
+
+
+def run_stage(sandbox_root: str, script_name: str, total_trials: int, trace_memory: bool) -> dict:
+    script_path = os.path.join(sandbox_root, 'codes', script_name)
+    result_path = os.path.join(sandbox_root, f'{script_name}.json')
+    command = [sys.executable, os.path.abspath(__file__), '--stage', script_path, '--result', result_path, '--trials', str(total_trials)]
+    if trace_memory:
+        command.append('--trace-memory')
+    # The stage traces stay in the sandbox instead of the repository's data/logs
+    environment = {**os.environ, utility_trace.TRACE_PATH_ENVIRONMENT_VARIABLE: os.path.join(sandbox_root, 'data', 'logs', 'trace.jsonl')}
+    completed = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, env=environment)
+    if completed.returncode != 0:
+        error_line_list = [line for line in completed.stderr.splitlines() if re.match(r'^[A-Za-z_.]*(Error|Exception)\b', line)]
+        return {'error': error_line_list[-1] if error_line_list else f'exit code {completed.returncode}'}
+    with open(result_path) as result_file:
+        return json.load(result_file)
+
+
+def environment_summary() -> dict:
+    summary = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+    for package_name in ['numpy', 'pandas', 'geopandas', 'sklearn', 'xgboost', 'skopt']:
+        try:
+            summary[package_name] = __import__(package_name).__version__
+        except ImportError:
+            summary[package_name] = None
+    try:
+        summary['commit'] = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BASE_ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        summary['commit'] = None
+    return summary
+
+
+def previous_record_of(history_path: str, scale: dict) -> dict|None:
+    if not os.path.exists(history_path):
+        return None
+    previous_record = None
+    with open(history_path) as history_file:
+        for line in history_file:
+            record = json.loads(line)
+            if record['scale'] == scale:
+                previous_record = record
+    return previous_record
+
+
+def print_report(record: dict, previous_record: dict|None) -> None:
+    print('== Results ==')
+    for script_name, result in record['stages'].items():
+        if 'error' in result:
+            print(f'  {script_name:<32} FAILED: {result["error"]}')
+            continue
+        line = f'  {script_name:<32} wall {result["wall_seconds"]:9.2f}s  cpu {result["cpu_seconds"]:9.2f}s  peak RSS {result["peak_rss_mb"]:9.1f} MB'
+        previous_result = (previous_record or {}).get('stages', {}).get(script_name, {})
+        if 'wall_seconds' in previous_result and previous_result['wall_seconds'] > 0:
+            line += f'  ({100 * (result["wall_seconds"] / previous_result["wall_seconds"] - 1):+.1f}% vs previous)'
+        print(line)
+        for trial in result.get('trials', []):
+            print(f'    trial total_lags={trial["total_lags"]} -> {trial["trial_seconds"]:.2f}s (fit {trial["fit_seconds"]:.2f}s summed over folds, features/scoring {trial["feature_and_scoring_seconds"]:.2f}s)')
+
+
+def run_suite(scale: dict, total_trials: int, trace_memory: bool, stage_script_list: list[str], keep_sandbox: bool) -> dict:
+    import benchmark_01_synthetic
+
+    sandbox_root = tempfile.mkdtemp(prefix='homelessness_benchmark_')
+    try:
+        print('== Synthetic Data ==')
+        start = time.perf_counter()
+        benchmark_01_synthetic.generate(sandbox_root, **scale)
+        generation_seconds = time.perf_counter() - start
+        shutil.copytree(CODES_ROOT, os.path.join(sandbox_root, 'codes'), ignore=shutil.ignore_patterns('__pycache__'))
+
+        record = {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'scale': scale,
+            'trials': total_trials,
+            'environment': environment_summary(),
+            'generation_seconds': generation_seconds,
+            'stages': dict[str, dict]()
+        }
+        for script_name in stage_script_list:
+            print(f'== {script_name} ==')
+            record['stages'][script_name] = run_stage(sandbox_root, script_name, total_trials, trace_memory)
+        return record
+    finally:
+        if keep_sandbox:
+            print('Sandbox kept at:', sandbox_root)
+        else:
+            shutil.rmtree(sandbox_root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time every pipeline stage on synthetic data and append the results to a JSON-lines history.')
+    parser.add_argument('--zip-codes', type=int, default=133)
+    parser.add_argument('--years', type=int, default=12)
+    parser.add_argument('--tracts-per-zip', type=int, default=16)
+    parser.add_argument('--crime-rows-per-year', type=int, default=200_000)
+    parser.add_argument('--trials', type=int, default=5, help='Bayesian search trials run by model_xgboost.py')
+    parser.add_argument('--stages', nargs='+', default=STAGE_SCRIPT_LIST, help='Stage scripts to run, in order')
+    parser.add_argument('--trace-memory', action='store_true', help='Also record the tracemalloc peak (slows the stages down)')
+    parser.add_argument('--history', default=os.path.join(BENCHMARK_DATA_FOLDER_PATH, 'history.jsonl'))
+    parser.add_argument('--keep-sandbox', action='store_true')
+    parser.add_argument('--stage', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        stage_result = run_stage_in_process(args.stage, args.trials, args.trace_memory)
+        with open(args.result, 'w') as result_file:
+            json.dump(stage_result, result_file)
+        sys.exit(0)
+
+    scale = {
+        'total_zip_codes': args.zip_codes,
+        'total_years': args.years,
+        'tracts_per_zip': args.tracts_per_zip,
+        'crime_rows_per_year': args.crime_rows_per_year
+    }
+    record = run_suite(scale, args.trials, args.trace_memory, args.stages, args.keep_sandbox)
+    previous_record = previous_record_of(args.history, scale)
+    print_report(record, previous_record)
+
+    print('== Storage ==')
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, 'a') as history_file:
+        history_file.write(json.dumps(record) + '\n')
@@ -0,0 +1,97 @@
+from xgboost import XGBClassifier
+from sklearn.preprocessing import StandardScaler
+import argparse
+import os
+import pickle
+import numpy as np
+import pandas as pd
+import xgboost
+import utility_cache
+import utility_features
+import utility_region
+import utility_spatial
+import utility_trace
+import utility_xgboost
+
+BASE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_ROOT = os.path.join(BASE_ROOT, 'models')
+EXPLAINED_DATA_FOLDER_PATH = os.path.join(utility_region.DATA_ROOT, 'explained')
+
+
+def top_drivers(contribution_array: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+    # Column indices of the top_k largest absolute contributions per row, largest first
+    top_k = min(top_k, contribution_array.shape[1])
+    abs_array = np.abs(contribution_array)
+    top_idx = np.argpartition(-abs_array, top_k - 1, axis=1)[:, :top_k]
+    order = np.argsort(-np.take_along_axis(abs_array, top_idx, axis=1), axis=1, kind='stable')
+    top_idx = np.take_along_axis(top_idx, order, axis=1)
+    return top_idx, np.take_along_axis(contribution_array, top_idx, axis=1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the top SHAP drivers of every ZIP code for a stored pipeline and year.')
+    parser.add_argument('--pipeline', choices=['0_5', '1', '2'], default='2', help='F-beta pipeline to explain')
+    parser.add_argument('--year', type=int, default=None, help='Year to explain (default: the last one)')
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--force', action='store_true', help='Recompute even if the table is cached')
+    args = parser.parse_args()
+
+    trace = utility_trace.StageTrace(__file__)
+
+    print('== Pipeline Retrieval ==')
+    trace.step('Pipeline Retrieval')
+    pipeline_path = os.path.join(MODEL_ROOT, f'xgboost_f{args.pipeline}_score.pickle')
+    model_hash = utility_cache.file_hash(pipeline_path)
+    with open(pipeline_path, 'rb') as pipeline_file:
+        scaler, model = tuple[StandardScaler, XGBClassifier](pickle.load(pipeline_file))
+
+    print('== Dataset Preparation ==')
+    trace.step('Dataset Preparation')
+    debiased_df = utility_region.read_debiased()
+    year = args.year or int(debiased_df['year'].max())
+    identity_columns, majority_columns, data_columns = utility_features.split_columns(debiased_df)
+    data_columns, neighbor_weights = utility_spatial.pipeline_spatial_inputs_of(data_columns, scaler.feature_names_in_)
+    total_lags, feature_columns = utility_features.pipeline_features_of(pipeline_path, scaler.feature_names_in_, data_columns)
+    dev_df = utility_features.build_lag_features(debiased_df, data_columns, total_lags, neighbor_weights=neighbor_weights)
+    year_df = dev_df[dev_df['year'] == year].reset_index(drop=True)
+    if year_df.empty:
+        raise ValueError(f'No ZIP code has {total_lags} lags of history in {year}')
+    trace.rows(year_df.shape[0])
+    print('Shape:', year_df.shape)
+    # Keyed by the model and by the exact features it explains, so regenerated input data is explained again
+    input_hash = utility_cache.frame_hash(year_df[['zip_code', *feature_columns]])
+    drivers_path = os.path.join(EXPLAINED_DATA_FOLDER_PATH, f'xgboost_f{args.pipeline}_score_{year}_top_{args.top_k}_{model_hash[:12]}_{input_hash[:12]}.csv')
+    if os.path.exists(drivers_path) and not args.force:
+        print(f'Cached: {drivers_path}')
+        raise SystemExit(0)
+
+    print('== Attribution ==')
+    trace.step('Attribution', rows_in=year_df.shape[0])
+    # One native call for every ZIP code; the last column is the bias term
+    X = utility_xgboost.to_float32(scaler.transform(year_df[feature_columns]))
+    booster = model.get_booster()
+    booster.set_param({'nthread': utility_xgboost.thread_budget()})
+    dmatrix = xgboost.DMatrix(X, nthread=utility_xgboost.thread_budget())
+    contribution_array = booster.predict(dmatrix, pred_contribs=True)
+    probability_array = model.predict_proba(X)[:, 1]
+    top_idx, top_contribution_array = top_drivers(contribution_array[:, :-1], args.top_k)
+
+    print('== Driver Table ==')
+    trace.step('Driver Table')
+    top_k = top_idx.shape[1]
+    drivers_df = pd.DataFrame({
+        'year': np.repeat(year_df['year'].values, top_k),
+        'zip_code': np.repeat(year_df['zip_code'].values, top_k),
+        'probability': np.repeat(probability_array, top_k),
+        'flagged': np.repeat((probability_array > 0.5).astype(int), top_k),
+        'rank': np.tile(np.arange(1, top_k + 1), year_df.shape[0]),
+        'feature': feature_columns.values[top_idx.ravel()],
+        'value': year_df[feature_columns].values[np.repeat(np.arange(year_df.shape[0]), top_k), top_idx.ravel()],
+        'contribution': top_contribution_array.ravel(),
+        'bias': np.repeat(contribution_array[:, -1], top_k)
+    })
+    os.makedirs(EXPLAINED_DATA_FOLDER_PATH, exist_ok=True)
+    drivers_df.to_csv(drivers_path, index=False)
+    trace.rows(drivers_df.shape[0])
+    print('Shape:', drivers_df.shape)
+    print(f'Saved: {drivers_path}')
@@ -1,18 +1,19 @@
 import os
-import geopandas as gpd
 import pandas as pd
+import utility_crosswalk
+import utility_region
+import utility_schema
+import utility_trace
 
 DATASET_NAME = os.path.basename(__file__)[7:-3]
 
-BASE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_ROOT = os.path.join(BASE_ROOT, 'data')
-ZIP_DATA_FOLDER_PATH = os.path.join(DATA_ROOT, 'utility', 'shape_files')
-RAW_DATA_FOLDER_PATH = os.path.join(DATA_ROOT, 'raw', DATASET_NAME)
-CROSS_DATA_FOLDER_PATH = os.path.join(DATA_ROOT, 'utility', 'crosswalk_files')
+REGION = utility_region.get_region()
+RAW_DATA_FOLDER_PATH = REGION.raw_data_folder_path(DATASET_NAME)
+CROSS_DATA_FOLDER_PATH = REGION.crosswalk_folder_path
 
-zip_path = os.path.join(ZIP_DATA_FOLDER_PATH, 'City_of_Los_Angeles_Zip_Codes.shp')
-zip_gdf:gpd.GeoDataFrame = gpd.read_file(zip_path)
-zip_gdf['ZCTA5CE10'] = zip_gdf['ZCTA5CE10'].astype(str).str.zfill(5)
+trace = utility_trace.StageTrace(__file__)
+trace.step('Shape File')
+zip_code_sr = REGION.read_zip_codes()
 
 raw_file_name_list = list[str]()
 for raw_file_name in os.listdir(RAW_DATA_FOLDER_PATH):
@@ -20,29 +21,32 @@ for raw_file_name in os.listdir(RAW_DATA_FOLDER_PATH):
         raw_file_name_list.append(raw_file_name)
 raw_file_name_list.sort()
 
+# Workbooks are parsed in parallel, and only the ones not parsed before (see utility_crosswalk)
+print('== Loading ==')
+trace.step('Loading', files=len(raw_file_name_list))
+raw_path_list = [os.path.join(RAW_DATA_FOLDER_PATH, raw_file_name) for raw_file_name in raw_file_name_list]
+parsed_list = utility_crosswalk.read_workbooks(raw_path_list)
+trace.rows(sum(raw_df.shape[0] for raw_df, _ in parsed_list))
+
 raw_df_list = list[pd.DataFrame]()
-for raw_file_name in raw_file_name_list:
+for raw_file_name, (raw_df, is_cached) in zip(raw_file_name_list, parsed_list):
 
     print(f'== {raw_file_name} ==')
-
-    print('  Loading ...')
-    raw_path = os.path.join(RAW_DATA_FOLDER_PATH, raw_file_name)
-    raw_df = pd.read_excel(raw_path, engine='openpyxl', sheet_name=0, dtype=str)
-    zip_idx = next((i for i, col in enumerate(raw_df.columns.str.lower()) if 'zip' in col), None)
-    tract_idx = next((i for i, col in enumerate(raw_df.columns.str.lower()) if 'tract' in col), None)
-    raw_df:pd.DataFrame = raw_df.iloc[:, [zip_idx, tract_idx]]
-    raw_df.columns = ['zip_code', 'tract']
+    print(f'  Loaded {"from cache" if is_cached else "from workbook"}: {raw_df.shape[0]} rows')
 
     print('  Cleaning ...')
+    trace.step('Cleaning', rows_in=raw_df.shape[0], file=raw_file_name)
     raw_df['quarter'] = raw_file_name[-9:-5] + '_' + raw_file_name[-11:-9]
     raw_df['zip_code'] = raw_df['zip_code'].str.zfill(5)
-    raw_df = raw_df[raw_df['zip_code'].isin(zip_gdf['ZCTA5CE10'])]
+    raw_df = raw_df[raw_df['zip_code'].isin(zip_code_sr)]
     raw_df = raw_df[['quarter'] + [col for col in raw_df.columns if col != 'quarter']]
+    trace.rows(raw_df.shape[0])
 
     raw_df_list.append(raw_df)
 
+trace.step('Storage', rows_in=sum(raw_df.shape[0] for raw_df in raw_df_list))
 clean_df = pd.concat(raw_df_list, ignore_index=True)
 clean_path = os.path.join(CROSS_DATA_FOLDER_PATH, f'{DATASET_NAME}.csv')
 if not os.path.exists(CROSS_DATA_FOLDER_PATH):
     os.makedirs(CROSS_DATA_FOLDER_PATH)
-clean_df.to_csv(clean_path, index=False)
\ No newline at end of file
+utility_schema.to_csv(clean_df, clean_path, utility_schema.CROSSWALK_DTYPE_DICT)
\ No newline at end of file
@@ -0,0 +1,104 @@
+from xgboost import XGBClassifier
+from sklearn.metrics import fbeta_score
+from sklearn.preprocessing import StandardScaler
+import os
+import pickle
+import pandas as pd
+import utility_features
+import utility_region
+import utility_spatial
+import utility_trace
+import utility_validation
+import utility_xgboost
+
+BASE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_ROOT = os.path.join(BASE_ROOT, 'models')
+FORECAST_DATA_FOLDER_PATH = os.path.join(utility_region.DATA_ROOT, 'forecast')
+
+# Direct multi-year outlooks: one model per horizon h learns whether the count rises in year t + h from the
+# features of year t, with the stored F2 pipeline's total_lags and hyperparameters. Each is validated on the latest
+# year whose outcome is known, then refit on every labelled year, that one included, before it forecasts
+HORIZON_LIST = [int(horizon) for horizon in os.environ.get('HOMELESSNESS_HORIZONS', '1,2,3').split(',')]
+THREADS = utility_xgboost.thread_budget()
+
+trace = utility_trace.StageTrace(__file__)
+
+print('== Summary of Debiased Dataset ==')
+trace.step('Loading')
+debiased_df = utility_region.read_debiased()
+trace.rows(debiased_df.shape[0])
+print('Shape:', debiased_df.shape)
+print('Unique years:', debiased_df['year'].nunique())
+print('Unique ZIP codes:', debiased_df['zip_code'].nunique())
+
+print('== Setup ==')
+trace.step('Setup')
+last_year = int(debiased_df['year'].max())
+identity_columns, majority_columns, data_columns = utility_features.split_columns(debiased_df)
+print('Horizons:', ', '.join(str(horizon) for horizon in HORIZON_LIST))
+
+print('== Pipeline Retrieval ==')
+trace.step('Pipeline Retrieval')
+best_pipeline_path = os.path.join(MODEL_ROOT, f'xgboost_f2_score.pickle')
+with open(best_pipeline_path, 'rb') as pipeline_file:
+    scaler, model = tuple[StandardScaler, XGBClassifier](pickle.load(pipeline_file))
+data_columns, neighbor_weights = utility_spatial.pipeline_spatial_inputs_of(data_columns, scaler.feature_names_in_)
+total_lags, feature_columns = utility_features.pipeline_features_of(best_pipeline_path, scaler.feature_names_in_, data_columns)
+model_params = {key: model.get_params()[key] for key in ['max_depth', 'n_estimators', 'learning_rate']}
+print(f'Hyperparameters -> total_lags: {total_lags}, max_depth: {model_params["max_depth"]}, n_estimators: {model_params["n_estimators"]}, learning_rate: {model_params["learning_rate"]:.6f}')
+
+print('== Dataset Preparation ==')
+trace.step('Dataset Preparation', rows_in=debiased_df.shape[0])
+dev_df = utility_features.build_lag_features(debiased_df, data_columns, total_lags, neighbor_weights=neighbor_weights)
+forecast_df = dev_df[dev_df['year'] == last_year].reset_index(drop=True)
+trace.rows(dev_df.shape[0])
+
+print('== Horizon Models ==')
+probability_dict = dict[str, object]()
+for horizon in HORIZON_LIST:
+    print(f'Horizon {horizon} ({last_year + horizon}):')
+    trace.step(f'Horizon {horizon}', rows_in=dev_df.shape[0])
+    horizon_sr = utility_features.horizon_target_of(dev_df, horizon)
+    # Validated on the latest year whose outcome h years later is known, trained on the years before it
+    test_year = last_year - horizon
+    train_mask = (dev_df['year'] < test_year) & horizon_sr.notna()
+    test_mask = (dev_df['year'] == test_year) & horizon_sr.notna()
+    if not train_mask.any() or not test_mask.any():
+        print('  Skipped: not enough observed years')
+        continue
+    horizon_scaler = StandardScaler()
+    X_train = utility_xgboost.to_float32(horizon_scaler.fit_transform(dev_df.loc[train_mask, feature_columns]))
+    y_train = horizon_sr[train_mask].astype(int).values
+    horizon_model = utility_xgboost.train_classifier(utility_xgboost.quantile_dmatrix(X_train, y_train, THREADS), model_params, THREADS)
+    y_test = horizon_sr[test_mask].astype(int).values
+    y_test_pred = horizon_model.predict(utility_xgboost.to_float32(horizon_scaler.transform(dev_df.loc[test_mask, feature_columns])))
+    test_f_scores = tuple(fbeta_score(y_test, y_test_pred, beta=beta, average='binary') for beta in utility_validation.F_BETA_LIST)
+    print(f'  Test ({test_year}) -> F0.5-Score {100 * test_f_scores[0]:.4f}%, F1-Score: {100 * test_f_scores[1]:.4f}%, F2-Score: {100 * test_f_scores[2]:.4f}%')
+
+    # Refit on every labelled year, so the forecast also learns from the most recent known outcomes
+    refit_mask = train_mask | test_mask
+    horizon_scaler = StandardScaler()
+    X_refit = utility_xgboost.to_float32(horizon_scaler.fit_transform(dev_df.loc[refit_mask, feature_columns]))
+    y_refit = horizon_sr[refit_mask].astype(int).values
+    horizon_model = utility_xgboost.train_classifier(utility_xgboost.quantile_dmatrix(X_refit, y_refit, THREADS), model_params, THREADS)
+    print(f'  Refit -> {X_refit.shape[0]} rows through {test_year}')
+
+    # Every ZIP code in one call
+    X_forecast = utility_xgboost.to_float32(horizon_scaler.transform(forecast_df[feature_columns]))
+    probability_dict[f'horizon_{horizon}'] = horizon_model.predict_proba(X_forecast)[:, 1]
+    trace.rows(forecast_df.shape[0])
+
+    horizon_pipeline_path = os.path.join(MODEL_ROOT, f'xgboost_f2_score_horizon_{horizon}.pickle')
+    with open(horizon_pipeline_path, 'wb') as pipeline_file:
+        pickle.dump((horizon_scaler, horizon_model), pipeline_file)
+    utility_features.write_manifest(horizon_pipeline_path, total_lags, feature_columns, horizon=horizon, last_training_year=test_year)
+
+print('== Forecast Storage ==')
+trace.step('Forecast Storage')
+probability_df = pd.DataFrame({'zip_code': forecast_df['zip_code'].values, **probability_dict})
+os.makedirs(FORECAST_DATA_FOLDER_PATH, exist_ok=True)
+probability_path = os.path.join(FORECAST_DATA_FOLDER_PATH, f'forecast_{last_year}.csv')
+probability_df.to_csv(probability_path, index=False)
+trace.rows(probability_df.shape[0])
+print('Shape:', probability_df.shape)
+print(probability_df.describe().loc[['mean', 'min', 'max']].drop(columns='zip_code').to_string())
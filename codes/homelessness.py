@@ -0,0 +1,163 @@
+import argparse
+import os
+import sys
+import uuid
+
+# One entry point for the whole pipeline, e.g.
+#   python codes/homelessness.py transform crime
+#   python codes/homelessness.py prepare --backend polars
+#   python codes/homelessness.py train --select-features
+#   python codes/homelessness.py score --pipelines f2
+# Every subcommand is also a function of this module that can be imported and called from another process.
+# Only the standard library is imported up front: each subcommand imports what it needs when it runs, so
+# scoring never loads geopandas or skopt and --help answers instantly.
+CODES_ROOT = os.path.dirname(os.path.abspath(__file__))
+if CODES_ROOT not in sys.path:
+    sys.path.insert(0, CODES_ROOT)
+
+
+def dataset_name_list() -> list[str]:
+    # e.g. ['homeless_count', 'income', ..., 'crime'] from transform_01_homeless_count.py ... transform_09_crime.py
+    return [file_name[13:-3] for file_name in sorted(os.listdir(CODES_ROOT)) if file_name.startswith('transform_') and file_name.endswith('.py')]
+
+
+def transform(dataset_list: list[str]|None = None, region_name: str|None = None) -> list[str]:
+    # The region's raw datasets through utility_transform, one trace per dataset as if its transform_0*.py
+    # script had run; returns the paths of the transformed CSVs
+    import utility_region
+    import utility_trace
+    import utility_transform
+
+    region = utility_region.get_region(region_name)
+    os.environ.setdefault(utility_trace.RUN_ID_ENVIRONMENT_VARIABLE, uuid.uuid4().hex[:12])
+    transformed_path_list = list[str]()
+    for dataset_name in dataset_list or dataset_name_list():
+        if dataset_name not in dataset_name_list():
+            raise ValueError(f'Unknown dataset {dataset_name!r}, expected one of {", ".join(dataset_name_list())}')
+        script_name = next(file_name for file_name in sorted(os.listdir(CODES_ROOT)) if file_name.startswith('transform_') and file_name[13:-3] == dataset_name)
+        trace = utility_trace.StageTrace(os.path.join(CODES_ROOT, script_name), region.name)
+        try:
+            transformed_df = utility_transform.TRANSFORM_FUNCTION_DICT[script_name[10:-3]](region, trace)
+            print('== Storage ==')
+            trace.step('Storage', rows_in=transformed_df.shape[0])
+            transformed_path_list.append(utility_transform.store_transformed(region, script_name[10:-3], transformed_df))
+        finally:
+            trace.close()
+    return transformed_path_list
+
+
+def prepare(backend: str = 'pandas', region_name: str|None = None) -> str:
+    # The region's transformed CSVs through utility_prepare (or its lazy Polars twin) in memory, without the
+    # intermediate CSVs the prepare_0*.py scripts write; returns the path of 04_debiased.csv
+    import utility_region
+    import utility_schema
+    import utility_trace
+
+    region = utility_region.get_region(region_name)
+    transformed_path_list = [os.path.join(region.transformed_folder_path, file_name) for file_name in sorted(os.listdir(region.transformed_folder_path)) if file_name.endswith('.csv')]
+    os.environ.setdefault(utility_trace.RUN_ID_ENVIRONMENT_VARIABLE, uuid.uuid4().hex[:12])
+    trace = utility_trace.StageTrace(os.path.join(CODES_ROOT, 'prepare_lazy.py' if backend == 'polars' else 'prepare.py'), region.name)
+    try:
+        trace.step('Preparing')
+        if backend == 'polars':
+            import utility_prepare_lazy
+
+            debiased_df = utility_prepare_lazy.debiased_lazy_frame(transformed_path_list).collect().to_pandas()
+        else:
+            import utility_prepare
+
+            debiased_df = utility_prepare.prepare_transformed([utility_schema.read_csv(transformed_path) for transformed_path in transformed_path_list])
+        trace.rows(debiased_df.shape[0])
+        trace.step('Storage', rows_in=debiased_df.shape[0])
+        os.makedirs(region.prepared_folder_path, exist_ok=True)
+        debiased_path = os.path.join(region.prepared_folder_path, '04_debiased.csv')
+        utility_schema.to_csv(debiased_df, debiased_path)
+    finally:
+        trace.close()
+    return debiased_path
+
+
+def train(select_features: bool = False, warm_start: bool = False) -> list[str]:
+    # Bayesian search (utility_search.search_pipelines) over the debiased dataset of every configured region (see
+    # utility_region.read_debiased), then optionally feature pruning (utility_pruning) and a warm-start refresh
+    # (utility_warm_start) on the same dataset; returns the stored pipeline paths
+    import utility_region
+    import utility_search
+    import utility_trace
+
+    os.environ.setdefault(utility_trace.RUN_ID_ENVIRONMENT_VARIABLE, uuid.uuid4().hex[:12])
+    trace = utility_trace.StageTrace(os.path.join(CODES_ROOT, 'model_xgboost.py'))
+    try:
+        trace.step('Loading')
+        debiased_df = utility_region.read_debiased()
+        trace.rows(debiased_df.shape[0])
+        search_result = utility_search.search_pipelines(debiased_df, utility_search.environment_search_options(), trace)
+        trace.step('Pipeline Storage')
+        pipeline_path_list = utility_search.store_pipelines(search_result)
+    finally:
+        trace.close()
+    if select_features:
+        import utility_pruning
+
+        trace = utility_trace.StageTrace(os.path.join(CODES_ROOT, 'select_features.py'))
+        try:
+            utility_pruning.prune_pipelines(debiased_df, utility_pruning.environment_pruning_options(), trace)
+        finally:
+            trace.close()
+    if warm_start:
+        import utility_warm_start
+
+        trace = utility_trace.StageTrace(os.path.join(CODES_ROOT, 'model_warm_start.py'))
+        try:
+            utility_warm_start.refresh_pipelines(debiased_df, utility_warm_start.environment_warm_start_options(), trace)
+        finally:
+            trace.close()
+    return pipeline_path_list
+
+
+def score(pipeline_name_list: list[str]|None = None, year: int|None = None):
+    # Returns the side-by-side scores and the per-ZIP predictions of the stored pipelines
+    import utility_features
+    import utility_region
+    import utility_scoring
+
+    debiased_df = utility_region.read_debiased()
+    identity_columns, majority_columns, data_columns = utility_features.split_columns(debiased_df)
+    pipeline_list = [utility_scoring.load_pipeline(pipeline_name, data_columns) for pipeline_name in pipeline_name_list or utility_scoring.PIPELINE_NAME_LIST]
+    return utility_scoring.score_pipelines(debiased_df, pipeline_list, year)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='homelessness', description='Run the stages of the homelessness pipeline.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    transform_parser = subparsers.add_parser('transform', help='Transform raw datasets into per-year, per-ZIP tables')
+    transform_parser.add_argument('datasets', nargs='*', help=f'Datasets to transform (default: all of {", ".join(dataset_name_list())})')
+    transform_parser.add_argument('--region', default=None, help='Region to process (default: HOMELESSNESS_REGION or the default region)')
+
+    prepare_parser = subparsers.add_parser('prepare', help='Merge, filter, clean and debias the transformed tables')
+    prepare_parser.add_argument('--backend', choices=['pandas', 'polars'], default=os.environ.get('HOMELESSNESS_PREPARE_BACKEND', 'pandas'), help='Run the prepare chain as pandas scripts or as one lazy Polars query')
+    prepare_parser.add_argument('--region', default=None, help='Region to process (default: HOMELESSNESS_REGION or the default region)')
+
+    train_parser = subparsers.add_parser('train', help='Search, train and store the F-beta pipelines')
+    train_parser.add_argument('--select-features', action='store_true', help='Prune the stored pipelines\' features afterwards')
+    train_parser.add_argument('--warm-start', action='store_true', help='Refresh the stored pipelines with a warm start afterwards')
+
+    score_parser = subparsers.add_parser('score', help='Score the stored pipelines side by side')
+    score_parser.add_argument('--pipelines', nargs='+', choices=['f0_5', 'f1', 'f2'], default=None, help='Pipelines to score (default: all)')
+    score_parser.add_argument('--year', type=int, default=None, help='Year to score (default: the last one)')
+    score_parser.add_argument('--output', default=None, help='Also write the predictions to this CSV file')
+    args = parser.parse_args()
+
+    if args.command == 'transform':
+        print('\n'.join(transform(args.datasets, args.region)))
+    elif args.command == 'prepare':
+        print(prepare(args.backend, args.region))
+    elif args.command == 'train':
+        print('\n'.join(train(args.select_features, args.warm_start)))
+    else:
+        score_df, prediction_df = score(args.pipelines, args.year)
+        print(score_df.map(lambda value: f'{100 * value:.4f}%').to_string())
+        if args.output is not None:
+            prediction_df.to_csv(args.output, index=False)
+            print(f'Saved: {args.output}')
@@ -0,0 +1,19 @@
+import utility_region
+import utility_trace
+import utility_warm_start
+
+# Refreshes the stored pipelines on the years added since they were trained, see utility_warm_start.refresh_pipelines;
+# the options come from HOMELESSNESS_WARM_START_ROUNDS, HOMELESSNESS_WARM_START_TOLERANCE and
+# HOMELESSNESS_WARM_START_TRAINED_THROUGH.
+
+trace = utility_trace.StageTrace(__file__)
+
+print('== Summary of Debiased Dataset ==')
+trace.step('Loading')
+debiased_df = utility_region.read_debiased()
+trace.rows(debiased_df.shape[0])
+print('Shape:', debiased_df.shape)
+print('Unique years:', debiased_df['year'].nunique())
+print('Unique ZIP codes:', debiased_df['zip_code'].nunique())
+
+utility_warm_start.refresh_pipelines(debiased_df, utility_warm_start.environment_warm_start_options(), trace)
@@ -0,0 +1,87 @@
+import argparse
+import concurrent.futures
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import utility_region
+import utility_trace
+
+CODES_ROOT = os.path.dirname(os.path.abspath(__file__))
+LOG_ROOT = os.path.join(utility_region.DATA_ROOT, 'logs')
+
+TRANSFORM_SCRIPT_LIST = sorted(file_name for file_name in os.listdir(CODES_ROOT) if file_name.startswith('transform_') and file_name.endswith('.py'))
+PREPARE_SCRIPT_LIST = sorted(file_name for file_name in os.listdir(CODES_ROOT) if file_name.startswith('prepare_0') and file_name.endswith('.py'))
+# The same chain as one lazy Polars query that only writes 04_debiased.csv
+LAZY_PREPARE_SCRIPT_LIST = ['prepare_lazy.py']
+
+
+def run_script(script_name: str, region_name: str, worker_semaphore: threading.Semaphore, environment: dict[str, str]|None = None) -> None:
+    log_folder_path = os.path.join(LOG_ROOT, region_name)
+    os.makedirs(log_folder_path, exist_ok=True)
+    with worker_semaphore:
+        print(f'  [{region_name}] {script_name} ...', flush=True)
+        start = time.perf_counter()
+        with open(os.path.join(log_folder_path, f'{script_name[:-3]}.log'), 'w') as log_file:
+            completed = subprocess.run(
+                [sys.executable, os.path.join(CODES_ROOT, script_name)],
+                env={**os.environ, utility_region.REGION_ENVIRONMENT_VARIABLE: region_name, **(environment or {})},
+                stdout=log_file, stderr=subprocess.STDOUT
+            )
+    if completed.returncode != 0:
+        raise RuntimeError(f'[{region_name}] {script_name} failed with exit code {completed.returncode}, see {log_folder_path}')
+    print(f'  [{region_name}] {script_name} done in {time.perf_counter() - start:.1f}s', flush=True)
+
+
+def run_region(region_name: str, worker_semaphore: threading.Semaphore, with_crosswalk: bool, prepare_backend: str = 'pandas') -> str:
+    # Transforms of a region are independent of each other; the prepare chain is sequential
+    if with_crosswalk:
+        run_script('filter_crosswalk.py', region_name, worker_semaphore)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(TRANSFORM_SCRIPT_LIST)) as transform_executor:
+        for future in [transform_executor.submit(run_script, script_name, region_name, worker_semaphore) for script_name in TRANSFORM_SCRIPT_LIST]:
+            future.result()
+    for script_name in (LAZY_PREPARE_SCRIPT_LIST if prepare_backend == 'polars' else PREPARE_SCRIPT_LIST):
+        run_script(script_name, region_name, worker_semaphore)
+    return region_name
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the transform and prepare stages of several regions in parallel, then model on the merged partitions.')
+    parser.add_argument('--regions', nargs='+', default=None, help='Regions to process (default: every configured region)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Stage scripts running at the same time')
+    parser.add_argument('--with-crosswalk', action='store_true', help='Rebuild each region\'s crosswalk from the HUD workbooks first')
+    parser.add_argument('--prepare-backend', choices=['pandas', 'polars'], default=os.environ.get('HOMELESSNESS_PREPARE_BACKEND', 'pandas'), help='Run the prepare chain as pandas scripts or as one lazy Polars query')
+    parser.add_argument('--model', action='store_true', help='Train on the merged partitions of the processed regions afterwards')
+    args = parser.parse_args()
+
+    region_name_list = args.regions or utility_region.region_name_list()
+    for region_name in region_name_list:
+        utility_region.get_region(region_name)
+    worker_semaphore = threading.Semaphore(max(1, args.workers))
+    # Every stage of this run shares one run id in the trace file
+    os.environ.setdefault(utility_trace.RUN_ID_ENVIRONMENT_VARIABLE, uuid.uuid4().hex[:12])
+
+    print('== Regional Stages ==')
+    failed_region_dict = dict[str, Exception]()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(region_name_list)) as region_executor:
+        future_dict = {region_executor.submit(run_region, region_name, worker_semaphore, args.with_crosswalk, args.prepare_backend): region_name for region_name in region_name_list}
+        for future in concurrent.futures.as_completed(future_dict):
+            try:
+                print(f'Region {future.result()} finished')
+            except Exception as error:
+                failed_region_dict[future_dict[future]] = error
+                print(f'Region {future_dict[future]} failed: {error}')
+
+    if args.model:
+        print('== Modeling ==')
+        done_region_name_list = [region_name for region_name in region_name_list if region_name not in failed_region_dict]
+        if done_region_name_list:
+            run_script('model_xgboost.py', 'merged', worker_semaphore, {
+                utility_region.REGION_ENVIRONMENT_VARIABLE: '',
+                utility_region.REGIONS_ENVIRONMENT_VARIABLE: ','.join(done_region_name_list)
+            })
+
+    if failed_region_dict:
+        sys.exit(1)
@@ -1,10 +1,15 @@
 import os
 import pandas as pd
+import utility_prepare
+import utility_region
+import utility_schema
+import utility_trace
 
-BASE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_ROOT = os.path.join(BASE_ROOT, 'data')
-TRANSFORMED_DATA_FOLDER_PATH = os.path.join(DATA_ROOT, 'transformed')
-PREPARED_DATA_FOLDER_PATH = os.path.join(DATA_ROOT, 'prepared')
+REGION = utility_region.get_region()
+TRANSFORMED_DATA_FOLDER_PATH = REGION.transformed_folder_path
+PREPARED_DATA_FOLDER_PATH = REGION.prepared_folder_path
+
+trace = utility_trace.StageTrace(__file__)
 
 transformed_file_name_list = list[str]()
 for transformed_file_name in os.listdir(TRANSFORMED_DATA_FOLDER_PATH):
@@ -12,28 +17,29 @@ for transformed_file_name in os.listdir(TRANSFORMED_DATA_FOLDER_PATH):
         transformed_file_name_list.append(transformed_file_name)
 transformed_file_name_list.sort()
 
-year_set = set[int]()
-zip_code_set = set[int]()
 transformed_df_list = list[pd.DataFrame]()
 for transformed_file_name in transformed_file_name_list:
 
     print(f'== {transformed_file_name} ==')
 
     print('  Loading ...')
+    trace.step('Loading', file=transformed_file_name)
     transformed_path = os.path.join(TRANSFORMED_DATA_FOLDER_PATH, transformed_file_name)
-    transformed_df = pd.read_csv(transformed_path, low_memory=False)
+    transformed_df = utility_schema.read_csv(transformed_path)
+    trace.rows(transformed_df.shape[0])
 
     print('  Minor Processing ...')
-    year_set.update(transformed_df['year'].unique().tolist())
-    zip_code_set.update(transformed_df['zip_code'].unique().tolist())
+    trace.step('Minor Processing', file=transformed_file_name)
     transformed_df_list.append(transformed_df)
 
 print('== Merging ==')
-merged_df = pd.MultiIndex.from_product([sorted(year_set), sorted(zip_code_set)], names=['year', 'zip_code']).to_frame(index=False)
-for transformed_df in transformed_df_list:
-    merged_df = pd.merge(merged_df, transformed_df, on=['year', 'zip_code'], how='outer')
-merged_df = merged_df.sort_values(['year', 'zip_code']).reset_index(drop=True)
+trace.step('Merging', rows_in=sum(transformed_df.shape[0] for transformed_df in transformed_df_list))
+merged_df = utility_prepare.merge_transformed(transformed_df_list)
+trace.rows(merged_df.shape[0])
 
 print('== Storage ==')
+trace.step('Storage', rows_in=merged_df.shape[0])
 merged_path = os.path.join(PREPARED_DATA_FOLDER_PATH, '01_merged.csv')
-merged_df.to_csv(merged_path, index=False)
\ No newline at end of file
+if not os.path.exists(PREPARED_DATA_FOLDER_PATH):
+    os.makedirs(PREPARED_DATA_FOLDER_PATH)
+utility_schema.to_csv(merged_df, merged_path)
\ No newline at end of file
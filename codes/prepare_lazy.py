@@ -0,0 +1,36 @@
+import os
+import utility_prepare_lazy
+import utility_region
+import utility_schema
+import utility_trace
+
+# The prepare chain as one lazy Polars query (see utility_prepare_lazy): only 04_debiased.csv is materialized
+REGION = utility_region.get_region()
+TRANSFORMED_DATA_FOLDER_PATH = REGION.transformed_folder_path
+PREPARED_DATA_FOLDER_PATH = REGION.prepared_folder_path
+
+trace = utility_trace.StageTrace(__file__)
+
+print('== Query Plan ==')
+trace.step('Query Plan')
+transformed_file_name_list = list[str]()
+for transformed_file_name in os.listdir(TRANSFORMED_DATA_FOLDER_PATH):
+    if transformed_file_name.endswith('.csv'):
+        transformed_file_name_list.append(transformed_file_name)
+transformed_file_name_list.sort()
+debiased_lf = utility_prepare_lazy.debiased_lazy_frame([os.path.join(TRANSFORMED_DATA_FOLDER_PATH, transformed_file_name) for transformed_file_name in transformed_file_name_list])
+
+print('== Execution ==')
+trace.step('Execution')
+debiased_df = debiased_lf.collect().to_pandas()
+trace.rows(debiased_df.shape[0])
+print('Shape:', debiased_df.shape)
+print('Total unique Years:', debiased_df['year'].nunique())
+print('Total unique ZIP Codes:', debiased_df['zip_code'].nunique())
+
+print('== Storage ==')
+trace.step('Storage', rows_in=debiased_df.shape[0])
+debiased_path = os.path.join(PREPARED_DATA_FOLDER_PATH, '04_debiased.csv')
+if not os.path.exists(PREPARED_DATA_FOLDER_PATH):
+    os.makedirs(PREPARED_DATA_FOLDER_PATH)
+utility_schema.to_csv(debiased_df, debiased_path)
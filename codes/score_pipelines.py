@@ -0,0 +1,58 @@
+import os
+import pandas as pd
+import utility_features
+import utility_region
+import utility_scoring
+import utility_trace
+
+SCORED_DATA_FOLDER_PATH = os.path.join(utility_region.DATA_ROOT, 'scored')
+
+trace = utility_trace.StageTrace(__file__)
+
+print('== Summary of Debiased Dataset ==')
+trace.step('Loading')
+debiased_df = utility_region.read_debiased()
+trace.rows(debiased_df.shape[0])
+print('Shape:', debiased_df.shape)
+print('Unique years:', debiased_df['year'].nunique())
+print('Unique ZIP codes:', debiased_df['zip_code'].nunique())
+
+print('== Setup ==')
+trace.step('Setup')
+last_year = int(debiased_df['year'].max())
+identity_columns, majority_columns, data_columns = utility_features.split_columns(debiased_df)
+
+print('== Pipeline Retrieval ==')
+trace.step('Pipeline Retrieval')
+pipeline_list = list[utility_scoring.Pipeline]()
+for pipeline_name in utility_scoring.PIPELINE_NAME_LIST:
+    pipeline = utility_scoring.load_pipeline(pipeline_name, data_columns)
+    pipeline_list.append(pipeline)
+    print(f'{pipeline_name} -> total_lags: {pipeline.total_lags}, features: {len(pipeline.feature_columns)}')
+
+print('== Dataset Preparation ==')
+trace.step('Dataset Preparation', rows_in=debiased_df.shape[0])
+test_df_dict = utility_scoring.test_frames_of(debiased_df, pipeline_list, last_year)
+for (total_lags, is_spatial), test_df in test_df_dict.items():
+    print(f'total_lags {total_lags}{" (spatial)" if is_spatial else ""} -> Shape: {test_df.shape}')
+trace.rows(sum(test_df.shape[0] for test_df in test_df_dict.values()))
+
+print('== Scoring ==')
+score_dict = dict[str, dict[str, float]]()
+prediction_df_list = list[pd.DataFrame]()
+for pipeline in pipeline_list:
+    test_df = test_df_dict[utility_scoring.test_key_of(pipeline)]
+    trace.step(f'Scoring {pipeline.name}', rows_in=test_df.shape[0])
+    score_dict[pipeline.name], prediction_df = utility_scoring.score_pipeline(pipeline, test_df)
+    prediction_df_list.append(prediction_df)
+
+print('== Side-by-Side Scores ==')
+trace.step('Storage')
+score_df = pd.DataFrame(score_dict)
+print(score_df.map(lambda value: f'{100 * value:.4f}%').to_string())
+os.makedirs(SCORED_DATA_FOLDER_PATH, exist_ok=True)
+score_df.to_csv(os.path.join(SCORED_DATA_FOLDER_PATH, f'scores_{last_year}.csv'), index_label='metric')
+prediction_df = pd.concat(prediction_df_list, axis=1).reset_index()
+prediction_df.to_csv(os.path.join(SCORED_DATA_FOLDER_PATH, f'predictions_{last_year}.csv'), index=False)
+trace.rows(prediction_df.shape[0])
+print('Shape:', prediction_df.shape)
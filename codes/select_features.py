@@ -0,0 +1,18 @@
+import utility_pruning
+import utility_region
+import utility_trace
+
+# Prunes the features of every stored pipeline, see utility_pruning.prune_pipelines; the thresholds come from
+# HOMELESSNESS_PRUNE_MIN_IMPORTANCE, HOMELESSNESS_PRUNE_MAX_CORRELATION and HOMELESSNESS_PRUNE_TOLERANCE.
+
+trace = utility_trace.StageTrace(__file__)
+
+print('== Summary of Debiased Dataset ==')
+trace.step('Loading')
+debiased_df = utility_region.read_debiased()
+trace.rows(debiased_df.shape[0])
+print('Shape:', debiased_df.shape)
+print('Unique years:', debiased_df['year'].nunique())
+print('Unique ZIP codes:', debiased_df['zip_code'].nunique())
+
+utility_pruning.prune_pipelines(debiased_df, utility_pruning.environment_pruning_options(), trace)
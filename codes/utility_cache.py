@@ -0,0 +1,49 @@
+import hashlib
+import inspect
+import os
+import pandas as pd
+import utility_region
+
+CACHE_ROOT = os.path.join(utility_region.DATA_ROOT, 'cache')
+
+
+def file_hash(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(2 ** 20), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def frame_hash(frame_df: pd.DataFrame) -> str:
+    # The values and column names of a frame, whatever its index
+    sha256 = hashlib.sha256(repr(list(frame_df.columns)).encode())
+    sha256.update(pd.util.hash_pandas_object(frame_df, index=False).values.tobytes())
+    return sha256.hexdigest()
+
+
+def code_version(parse_function, *dependency_list) -> str:
+    # The parsing code and whatever it filters against (e.g. the region's ZIP codes), but not the
+    # rest of the stage script, so iterating on the transformation keeps the cache warm
+    sha256 = hashlib.sha256(inspect.getsource(parse_function).encode())
+    for dependency in dependency_list:
+        if hasattr(dependency, 'to_wkb'):  # Shapes, e.g. the ZIP code polygons a spatial join runs against
+            dependency = dependency.to_wkb()
+        if isinstance(dependency, (pd.Series, pd.DataFrame)):
+            sha256.update(pd.util.hash_pandas_object(dependency, index=False).values.tobytes())
+        else:
+            sha256.update(repr(dependency).encode())
+    return sha256.hexdigest()
+
+
+def cached_frame(namespace: str, raw_path: str, parse_function, *dependency_list) -> tuple[pd.DataFrame, bool]:
+    # parse_function(raw_path, *dependency_list), stored as Parquet under the raw file's content hash and the code version;
+    # returns the frame and whether it came from the cache
+    cache_path = os.path.join(CACHE_ROOT, namespace, f'{file_hash(raw_path)}_{code_version(parse_function, *dependency_list)[:16]}.parquet')
+    if os.path.exists(cache_path):
+        return pd.read_parquet(cache_path), True
+    parsed_df = parse_function(raw_path, *dependency_list)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    parsed_df.to_parquet(f'{cache_path}.{os.getpid()}')
+    os.replace(f'{cache_path}.{os.getpid()}', cache_path)
+    return parsed_df, False
@@ -0,0 +1,59 @@
+import concurrent.futures
+import multiprocessing
+import os
+import pandas as pd
+import utility_cache
+
+CACHE_FOLDER_PATH = os.path.join(utility_cache.CACHE_ROOT, 'crosswalk')
+WORKERS_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_CROSSWALK_WORKERS'
+
+
+def cell_text(value) -> str|None:
+    # Same text pd.read_excel(dtype=str) gives: whole floats lose their '.0', empty cells stay missing
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def parse_workbook(raw_path: str) -> pd.DataFrame:
+    # Streams the first sheet read-only and only decodes the columns between the ZIP and the tract ones
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(raw_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        header_list = [str(column).lower() for column in next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True))]
+        zip_idx = next((i for i, column in enumerate(header_list) if 'zip' in column), None)
+        tract_idx = next((i for i, column in enumerate(header_list) if 'tract' in column), None)
+        first_idx = min(zip_idx, tract_idx)
+        row_list = [
+            (cell_text(row[zip_idx - first_idx]), cell_text(row[tract_idx - first_idx]))
+            for row in worksheet.iter_rows(min_row=2, min_col=first_idx + 1, max_col=max(zip_idx, tract_idx) + 1, values_only=True)
+        ]
+    finally:
+        workbook.close()
+    return pd.DataFrame(row_list, columns=['zip_code', 'tract'], dtype=object)
+
+
+def read_workbook(raw_path: str) -> tuple[pd.DataFrame, bool]:
+    # Parsed quarters are cached under the workbook's content hash, so renamed or re-downloaded files hit the cache too
+    cache_path = os.path.join(CACHE_FOLDER_PATH, f'{utility_cache.file_hash(raw_path)}.pickle')
+    if os.path.exists(cache_path):
+        return pd.read_pickle(cache_path), True
+    raw_df = parse_workbook(raw_path)
+    os.makedirs(CACHE_FOLDER_PATH, exist_ok=True)
+    raw_df.to_pickle(f'{cache_path}.{os.getpid()}')
+    os.replace(f'{cache_path}.{os.getpid()}', cache_path)
+    return raw_df, False
+
+
+def read_workbooks(raw_path_list: list[str], workers: int|None = None) -> list[tuple[pd.DataFrame, bool]]:
+    workers = workers or int(os.environ.get(WORKERS_ENVIRONMENT_VARIABLE) or os.cpu_count() or 1)
+    workers = min(workers, len(raw_path_list))
+    if workers <= 1:
+        return [read_workbook(raw_path) for raw_path in raw_path_list]
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        return list(executor.map(read_workbook, raw_path_list))
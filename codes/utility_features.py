@@ -0,0 +1,104 @@
+import json
+import os
+import pandas as pd
+
+IDENTITY_COLUMNS = pd.Index(['year', 'zip_code'])
+TARGET_COLUMN = 'target'
+
+
+def split_columns(debiased_df: pd.DataFrame) -> tuple[pd.Index, pd.Index, pd.Index]:
+    majority_columns = pd.Index([column for column in debiased_df.columns if column.endswith('_majority')])
+    data_columns = debiased_df.columns.difference(IDENTITY_COLUMNS.union(majority_columns))
+    return IDENTITY_COLUMNS, majority_columns, data_columns
+
+
+def feature_columns_of(data_columns: pd.Index, total_lags: int) -> pd.Index:
+    return pd.Index([f'{column}_lag_{lag}' for column in data_columns for lag in range(total_lags + 1)])
+
+
+def total_lags_of(feature_columns, data_columns: pd.Index) -> int:
+    # Recovers a stored pipeline's total_lags from the feature names its scaler was fitted on
+    total_lags = len(feature_columns) // len(data_columns) - 1
+    if list(feature_columns) != list(feature_columns_of(data_columns, total_lags)):
+        raise ValueError('The stored pipeline was fitted on different feature columns than the debiased dataset provides')
+    return total_lags
+
+
+def manifest_path_of(pipeline_path: str) -> str:
+    return f'{os.path.splitext(pipeline_path)[0]}.json'
+
+
+def read_manifest(pipeline_path: str) -> dict:
+    # Empty for pipelines stored without a manifest
+    manifest_path = manifest_path_of(pipeline_path)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as manifest_file:
+        return json.load(manifest_file)
+
+
+def write_manifest(pipeline_path: str, total_lags: int, feature_columns: pd.Index, **detail_dict) -> None:
+    # For a newly searched pipeline: the details of the one it replaces are dropped
+    with open(manifest_path_of(pipeline_path), 'w') as manifest_file:
+        json.dump({'total_lags': int(total_lags), 'feature_columns': list(feature_columns), **detail_dict}, manifest_file, indent=4)
+
+
+def update_manifest(pipeline_path: str, total_lags: int, feature_columns: pd.Index, **detail_dict) -> None:
+    # For a stored pipeline refit in place (pruned, refreshed): the details it already has, e.g. max_group_gap, are kept unless given again
+    previous_detail_dict = {key: value for key, value in read_manifest(pipeline_path).items() if key not in ['total_lags', 'feature_columns']}
+    write_manifest(pipeline_path, total_lags, feature_columns, **{**previous_detail_dict, **detail_dict})
+
+
+def kept_data_columns_of(pipeline_path_list: list[str], data_columns: pd.Index) -> pd.Index:
+    # The data columns at least one lag of which a stored pipeline's manifest keeps (see select_features.py), in
+    # data_columns order; every data column when no pipeline has a manifest yet
+    kept_column_set = set[str]()
+    for pipeline_path in pipeline_path_list:
+        kept_column_set.update(feature_column.rsplit('_lag_', 1)[0] for feature_column in read_manifest(pipeline_path).get('feature_columns', []))
+    return data_columns[data_columns.isin(kept_column_set)] if kept_column_set else data_columns
+
+
+def pipeline_features_of(pipeline_path: str, feature_names, data_columns: pd.Index) -> tuple[int, pd.Index]:
+    # The total_lags and feature columns a stored pipeline scores with: the kept set of its manifest (which may be
+    # pruned, see select_features.py), or every lag of every data column for pipelines stored without one
+    manifest_path = manifest_path_of(pipeline_path)
+    manifest_dict = read_manifest(pipeline_path)
+    if not manifest_dict:
+        total_lags = total_lags_of(feature_names, data_columns)
+        return total_lags, feature_columns_of(data_columns, total_lags)
+    if list(feature_names) != manifest_dict['feature_columns']:
+        raise ValueError(f'The stored pipeline was fitted on different feature columns than {manifest_path} lists')
+    if not set(manifest_dict['feature_columns']).issubset(feature_columns_of(data_columns, manifest_dict['total_lags'])):
+        raise ValueError('The stored pipeline was fitted on different feature columns than the debiased dataset provides')
+    return manifest_dict['total_lags'], pd.Index(manifest_dict['feature_columns'])
+
+
+def build_lag_features(debiased_df: pd.DataFrame, data_columns: pd.Index, total_lags: int, majority_columns: pd.Index|None = None, neighbor_weights=None) -> pd.DataFrame:
+    # Same rows and values as shifting every ZIP code's frame on its own, in one grouped pass:
+    # {column}_lag_{k} holds the value k rows earlier for the same ZIP code, rows without a full
+    # lag history are dropped, and the target says whether the homeless count rose since the previous row.
+    # Optional feature group: {column}_neighbor data columns (see utility_spatial) are derived here from neighbor_weights
+    neighbor_columns = pd.Index([column for column in data_columns if column not in debiased_df.columns])
+    if len(neighbor_columns) > 0:
+        import utility_spatial
+
+        if neighbor_weights is None:
+            raise ValueError(f'Neighbor weights are needed to derive {", ".join(neighbor_columns)}')
+        debiased_df = utility_spatial.add_neighbor_columns(debiased_df, neighbor_columns, neighbor_weights)
+    lag_df = debiased_df[IDENTITY_COLUMNS.union(data_columns)].copy()
+    zip_code_groups = lag_df.groupby('zip_code', sort=False)[list(data_columns)]
+    lag_df_list = [lag_df]
+    for lag in range(1, total_lags + 1):
+        lag_df_list.append(zip_code_groups.shift(lag).rename(columns=lambda column: f'{column}_lag_{lag}'))
+    lag_df = pd.concat(lag_df_list, axis=1).dropna().rename(columns={column: f'{column}_lag_0' for column in data_columns})
+    if majority_columns is not None and len(majority_columns) > 0:
+        lag_df[majority_columns] = debiased_df.loc[lag_df.index, majority_columns]
+    lag_df[TARGET_COLUMN] = lag_df.groupby('zip_code', sort=False)['homeless_individuals_count_lag_0'].diff().gt(0).astype(int)
+    return lag_df.sort_values(['year', 'zip_code']).reset_index(drop=True)
+
+
+def horizon_target_of(lag_df: pd.DataFrame, horizon: int) -> pd.Series:
+    # The target of the same ZIP code horizon years later, aligned with lag_df's rows; NaN while that year is not observed
+    future_df = lag_df[['year', 'zip_code', TARGET_COLUMN]].assign(year=lag_df['year'] - horizon)
+    horizon_sr = lag_df[['year', 'zip_code']].merge(future_df, on=['year', 'zip_code'], how='left')[TARGET_COLUMN]
+    return horizon_sr.set_axis(lag_df.index)
@@ -0,0 +1,90 @@
+from sklearn.metrics import fbeta_score, precision_recall_curve
+import os
+import numpy as np
+import pandas as pd
+import utility_schema
+
+BIAS_TERM_DICT = utility_schema.BIAS_TERM_DICT
+GROUP_KEY_LIST = [(group_name, term) for group_name, group_list in BIAS_TERM_DICT.items() for term in group_list]
+
+MAX_GROUP_GAP_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_MAX_GROUP_GAP'
+
+
+def max_group_gap_limit() -> float|None:
+    # Fairness-aware selection: pipelines whose group F2-scores are more than this far apart within any bias
+    # dimension are not selected or promoted; unset, there is no limit
+    limit = os.environ.get(MAX_GROUP_GAP_ENVIRONMENT_VARIABLE)
+    return float(limit) if limit else None
+
+
+def group_mask_dict(test_df: pd.DataFrame) -> dict[tuple[str, str], np.ndarray]:
+    return {(group_name, term): (test_df[f'{group_name}_majority'] == term).values for group_name, group_list in BIAS_TERM_DICT.items() for term in group_list}
+
+
+def group_f_scores(y_test: np.ndarray, y_test_pred: np.ndarray, mask_dict: dict[tuple[str, str], np.ndarray], beta: float = 2) -> dict[tuple[str, str], float]:
+    # A group no ZIP code belongs to this year has no score
+    return {
+        key: fbeta_score(y_test[group_mask], y_test_pred[group_mask], beta=beta, average='binary') if group_mask.any() else np.nan
+        for key, group_mask in mask_dict.items()
+    }
+
+
+def group_thresholds(y_test: np.ndarray, y_prob: np.ndarray, mask_dict: dict[tuple[str, str], np.ndarray]) -> dict[tuple[str, str], float]:
+    # Per group, the threshold maximizing F2 on its own precision-recall curve; a group no ZIP code belongs to has none
+    threshold_dict = dict[tuple[str, str], float]()
+    for key, group_mask in mask_dict.items():
+        if not group_mask.any():
+            continue
+        precisions, recalls, thresholds = precision_recall_curve(y_test[group_mask], y_prob[group_mask])
+        f2_scores = 5 * (precisions * recalls) / (4 * precisions + recalls)
+        threshold_dict[key] = float(thresholds[f2_scores.argmax()])
+    return threshold_dict
+
+
+def apply_group_thresholds(y_prob: np.ndarray, y_pred: np.ndarray, mask_dict: dict[tuple[str, str], np.ndarray], threshold_dict: dict[tuple[str, str], float]) -> np.ndarray:
+    # Groups are applied in BIAS_TERM_DICT order, so a ZIP code ends up with the threshold of the last group it belongs to
+    y_pred = y_pred.copy()
+    for key, group_mask in mask_dict.items():
+        if key in threshold_dict:
+            y_pred[group_mask] = (y_prob[group_mask] >= threshold_dict[key]).astype(int)
+    return y_pred
+
+
+def group_code_array_of(test_df: pd.DataFrame) -> np.ndarray:
+    # Per row and bias dimension, the position of the row's group in GROUP_KEY_LIST (-1 when it has none)
+    code_array = np.full((test_df.shape[0], len(BIAS_TERM_DICT)), -1, dtype=np.int8)
+    for group_idx, (group_name, term) in enumerate(GROUP_KEY_LIST):
+        code_array[(test_df[f'{group_name}_majority'] == term).values, list(BIAS_TERM_DICT).index(group_name)] = group_idx
+    return code_array
+
+
+def grouped_f_scores(y_test: np.ndarray, y_pred_array: np.ndarray, code_array: np.ndarray, beta: float = 2) -> np.ndarray:
+    # group_f_scores for many prediction vectors at once: y_pred_array holds one row of predictions per trial, and a
+    # single bincount over (trial, group, label, prediction) gives every group's confusion matrix in every trial.
+    # Returns (trials, len(GROUP_KEY_LIST)) F-scores, NaN for groups without rows
+    y_pred_array = np.atleast_2d(y_pred_array).astype(np.int64)
+    total_trials, total_groups = y_pred_array.shape[0], len(GROUP_KEY_LIST)
+    count_idx = ((np.arange(total_trials)[:, None, None] * total_groups + code_array[None, :, :]) * 2 + y_test[None, :, None]) * 2 + y_pred_array[:, :, None]
+    count_idx = count_idx[np.broadcast_to(code_array[None, :, :] >= 0, count_idx.shape)]
+    count_array = np.bincount(count_idx, minlength=total_trials * total_groups * 4).reshape(total_trials, total_groups, 2, 2)
+    tp, fp, fn = count_array[..., 1, 1], count_array[..., 0, 1], count_array[..., 1, 0]
+    numerator = (1 + beta ** 2) * tp
+    denominator = numerator + beta ** 2 * fn + fp
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_score_array = np.where(denominator > 0, numerator / denominator, 0.0)  # sklearn's zero_division default
+    return np.where(count_array.sum(axis=(2, 3)) > 0, f_score_array, np.nan)
+
+
+def max_group_gaps(f_score_array: np.ndarray) -> np.ndarray:
+    # Per trial, the widest spread between the best and the worst scored group of the same bias dimension
+    gap_array = np.zeros(f_score_array.shape[0])
+    for group_name in BIAS_TERM_DICT:
+        dimension_array = f_score_array[:, [group_idx for group_idx, key in enumerate(GROUP_KEY_LIST) if key[0] == group_name]]
+        scored_mask = ~np.isnan(dimension_array)
+        dimension_gap_array = np.where(scored_mask, dimension_array, -np.inf).max(axis=1) - np.where(scored_mask, dimension_array, np.inf).min(axis=1)
+        gap_array = np.maximum(gap_array, np.where(scored_mask.sum(axis=1) > 1, dimension_gap_array, 0.0))
+    return gap_array
+
+
+def debiased_predictions(y_test: np.ndarray, y_prob: np.ndarray, y_test_pred: np.ndarray, mask_dict: dict[tuple[str, str], np.ndarray]) -> np.ndarray:
+    return apply_group_thresholds(y_prob, y_test_pred, mask_dict, group_thresholds(y_test, y_prob, mask_dict))
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import utility_schema
+
+# The four prepare stages (merge -> filter -> clean -> debias) as functions of their input frames; the
+# prepare_0*.py scripts read and write the CSVs in between, homelessness.prepare chains them in memory.
+
+
+def merge_transformed(transformed_df_list: list[pd.DataFrame]) -> pd.DataFrame:
+    # Every transformed table on the grid of all years and ZIP codes
+    year_set = set[int]()
+    zip_code_set = set[int]()
+    for transformed_df in transformed_df_list:
+        year_set.update(transformed_df['year'].unique().tolist())
+        zip_code_set.update(transformed_df['zip_code'].unique().tolist())
+    merged_df = pd.MultiIndex.from_product([sorted(year_set), sorted(zip_code_set)], names=['year', 'zip_code']).to_frame(index=False)
+    for transformed_df in transformed_df_list:
+        merged_df = pd.merge(merged_df, transformed_df, on=['year', 'zip_code'], how='outer')
+    return merged_df.sort_values(['year', 'zip_code']).reset_index(drop=True)
+
+
+def filter_merged(merged_df: pd.DataFrame) -> tuple[pd.DataFrame, list[int], list[int]]:
+    # ZIP codes without an all-null column, within the range of years missing fewer than 10% of the columns;
+    # returns the filtered frame, those ZIP codes and those years
+    years_with_minimum_non_null_columns:list[int] = merged_df.groupby('year') \
+        .apply(lambda column_sr: column_sr.isnull().all(), include_groups=False) \
+        .sum(axis=1).apply(lambda total_null_columns: total_null_columns / (merged_df.shape[1] - 1)) \
+        .pipe(lambda sr: sr[sr < 0.1]).index.tolist()
+    zip_code_with_non_null_columns_list:list[int] = merged_df.groupby('zip_code') \
+        .apply(lambda column_sr: column_sr.isnull().all(), include_groups=False) \
+        .any(axis=1).pipe(lambda sr: sr[~sr].index.tolist())
+    filtered_df = merged_df[merged_df['zip_code'].isin(zip_code_with_non_null_columns_list)]\
+        .sort_values(['year', 'zip_code']).reset_index(drop=True)
+    filtered_df = filtered_df[
+        (min(years_with_minimum_non_null_columns) <= filtered_df['year']) & \
+        (filtered_df['year'] <= max(years_with_minimum_non_null_columns))\
+    ].reset_index(drop=True)
+    return filtered_df, zip_code_with_non_null_columns_list, years_with_minimum_non_null_columns
+
+
+def clean_income_columns(filtered_df: pd.DataFrame) -> pd.DataFrame:
+    # Income reported in thousands (below the ZIP code's mean) is scaled back
+    filtered_df = filtered_df.copy()
+    income_column_list = [column for column in filtered_df.columns if column.startswith('median_income')]
+    for zip_code in filtered_df['zip_code'].unique():
+        zip_code_mask = filtered_df['zip_code'] == zip_code
+        for column in income_column_list:
+            income_mask = filtered_df.loc[zip_code_mask, column] < filtered_df.loc[zip_code_mask, column].mean()
+            filtered_df.loc[zip_code_mask & income_mask, column] *= 1000.0
+    return filtered_df
+
+
+def clean_all_columns(filtered_df: pd.DataFrame) -> pd.DataFrame:
+    # Zeros are treated as missing and every ZIP code's gaps are interpolated linearly, edges taking the nearest known value and empty columns 0
+    data_columns = filtered_df.columns.difference(['year', 'zip_code'])
+    zip_code_df_list = list[pd.DataFrame]()
+    for zip_code in filtered_df['zip_code'].unique():
+        zip_code_df = filtered_df[filtered_df['zip_code'] == zip_code].copy()
+        zip_code_df[zip_code_df == 0.0] = np.nan
+        zip_code_df[data_columns] = zip_code_df[data_columns].interpolate(method='linear', limit_direction='both', axis=0).bfill().ffill().fillna(0.0)
+        zip_code_df_list.append(zip_code_df)
+    return pd.concat(zip_code_df_list).sort_values(['year', 'zip_code']).reset_index(drop=True)
+
+
+def debias_cleaned(cleaned_df: pd.DataFrame) -> pd.DataFrame:
+    # Group breakdowns are dropped and replaced by each ZIP code's majority group
+    bias_term_list = [term for term_list in utility_schema.BIAS_TERM_DICT.values() for term in term_list]
+    debiased_df = cleaned_df.drop(columns=[column for column in cleaned_df.columns if any(column.endswith(bias_term) for bias_term in bias_term_list)])
+    groups_population_df = cleaned_df \
+        .drop(columns=[column for column in cleaned_df.columns if not column.startswith('population_')]) \
+        .assign(zip_code=cleaned_df['zip_code']).reset_index(drop=True)
+    groups_population_df.columns = groups_population_df.columns.str.replace('population_', '')
+    for group_name, group_list in utility_schema.BIAS_TERM_DICT.items():
+        debiased_df[f'{group_name}_majority'] = groups_population_df[group_list].idxmax(axis=1)
+    return debiased_df
+
+
+def prepare_transformed(transformed_df_list: list[pd.DataFrame]) -> pd.DataFrame:
+    # The debiased dataset of a region from its transformed tables, without the intermediate CSVs; every
+    # stage gets the schema dtypes its script would read back from the previous stage's CSV
+    merged_df = utility_schema.apply_schema(merge_transformed(transformed_df_list))
+    filtered_df, _, _ = filter_merged(merged_df)
+    cleaned_df = utility_schema.apply_schema(clean_all_columns(clean_income_columns(utility_schema.apply_schema(filtered_df))))
+    return utility_schema.apply_schema(debias_cleaned(cleaned_df))
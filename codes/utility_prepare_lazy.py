@@ -0,0 +1,89 @@
+import os
+import pandas as pd
+import utility_schema
+
+# Polars reads its thread count once, at import
+if os.environ.get('HOMELESSNESS_THREADS'):
+    os.environ.setdefault('POLARS_MAX_THREADS', os.environ['HOMELESSNESS_THREADS'])
+try:
+    import polars as pl
+except ModuleNotFoundError as error:
+    raise ModuleNotFoundError('The polars prepare backend needs polars installed (pip install polars)') from error
+
+POLARS_DTYPE_DICT = {
+    'int16': pl.Int16,
+    'int32': pl.Int32,
+    'float32': pl.Float32,
+    'category': pl.String
+}
+
+
+def debiased_lazy_frame(transformed_path_list: list[str]) -> pl.LazyFrame:
+    # The four prepare stages (merge -> filter -> clean -> debias, see utility_prepare) as one lazy Polars query over
+    # the transformed CSVs: Polars pushes projections and predicates down the plan and runs it on every core.
+    # Every step mirrors its pandas stage, including float32 arithmetic where the pandas stage does it in float32.
+
+    # Merge: every transformed table on the grid of all years and ZIP codes
+    transformed_lf_list = list[pl.LazyFrame]()
+    for transformed_path in transformed_path_list:
+        dtype_dict = utility_schema.dtype_dict_of(pd.read_csv(transformed_path, nrows=0).columns)
+        transformed_lf_list.append(pl.scan_csv(transformed_path, schema_overrides={column: POLARS_DTYPE_DICT[dtype] for column, dtype in dtype_dict.items()}))
+    year_lf = pl.concat([transformed_lf.select('year') for transformed_lf in transformed_lf_list]).unique()
+    zip_code_lf = pl.concat([transformed_lf.select('zip_code') for transformed_lf in transformed_lf_list]).unique()
+    merged_lf = year_lf.join(zip_code_lf, how='cross')
+    for transformed_lf in transformed_lf_list:
+        merged_lf = merged_lf.join(transformed_lf, on=['year', 'zip_code'], how='left')
+    merged_columns = merged_lf.collect_schema().names()
+
+    # Filter: ZIP codes without an all-null column, within the range of years missing fewer than 10% of the columns
+    year_range_lf = merged_lf \
+        .group_by('year') \
+        .agg(pl.sum_horizontal([pl.col(column).is_null().all().cast(pl.Int32) for column in merged_columns if column != 'year']).alias('total_null_columns')) \
+        .filter(pl.col('total_null_columns') / (len(merged_columns) - 1) < 0.1) \
+        .select(pl.col('year').min().alias('min_year'), pl.col('year').max().alias('max_year'))
+    complete_zip_code_lf = merged_lf \
+        .group_by('zip_code') \
+        .agg(pl.any_horizontal([pl.col(column).is_null().all() for column in merged_columns if column != 'zip_code']).alias('has_null_column')) \
+        .filter(~pl.col('has_null_column')) \
+        .select('zip_code')
+    filtered_lf = merged_lf \
+        .join(complete_zip_code_lf, on='zip_code', how='semi') \
+        .join(year_range_lf, how='cross') \
+        .filter(pl.col('year').is_between(pl.col('min_year'), pl.col('max_year'))) \
+        .drop(['min_year', 'max_year'])
+
+    # Clean: income reported in thousands is scaled back, then zeros are treated as missing and every
+    # ZIP code's gaps are interpolated linearly, edges taking the nearest known value and empty columns 0
+    data_columns = [column for column in merged_columns if column not in ['year', 'zip_code']]
+    income_columns = [column for column in data_columns if column.startswith('median_income')]
+    clean_lf = filtered_lf \
+        .sort(['zip_code', 'year']) \
+        .with_columns([
+            pl.when(pl.col(column) < (pl.col(column).sum() / pl.col(column).count().cast(pl.Float32)).over('zip_code'))
+                .then(pl.col(column) * pl.lit(1000.0, dtype=pl.Float32))
+                .otherwise(pl.col(column))
+                .alias(column)
+            for column in income_columns
+        ]) \
+        .with_columns([
+            pl.when(pl.col(column) == 0.0).then(None).otherwise(pl.col(column)).alias(column)
+            for column in data_columns
+        ]) \
+        .with_columns([
+            pl.col(column).cast(pl.Float64).interpolate().backward_fill().forward_fill().over('zip_code').fill_null(0.0).cast(pl.Float32).alias(column)
+            for column in data_columns
+        ])
+
+    # Debias: group breakdowns are dropped and replaced by each ZIP code's majority group
+    bias_term_list = [term for term_list in utility_schema.BIAS_TERM_DICT.values() for term in term_list]
+    debiased_lf = clean_lf \
+        .with_columns([
+            pl.coalesce([
+                pl.when(pl.col(f'population_{term}') == pl.max_horizontal([pl.col(f'population_{term}') for term in group_list])).then(pl.lit(term))
+                for term in group_list
+            ]).alias(f'{group_name}_majority')
+            for group_name, group_list in utility_schema.BIAS_TERM_DICT.items()
+        ]) \
+        .drop([column for column in data_columns if any(column.endswith(term) for term in bias_term_list)]) \
+        .sort(['year', 'zip_code'])
+    return debiased_lf
@@ -0,0 +1,135 @@
+from xgboost import XGBClassifier
+from sklearn.metrics import fbeta_score
+from sklearn.preprocessing import StandardScaler
+import dataclasses
+import os
+import pickle
+import time
+import numpy as np
+import pandas as pd
+import xgboost
+import utility_features
+import utility_groups
+import utility_scoring
+import utility_spatial
+import utility_trace
+import utility_validation
+import utility_xgboost
+
+
+@dataclasses.dataclass(frozen=True)
+class PruningOptions:
+    min_importance: float = 0.005       # Share of the total mean absolute SHAP value below which a feature is dropped
+    max_correlation: float = 0.95       # Of every pair correlated beyond this, only the more important feature is kept
+    tolerance: float = 0.0              # F-score a pruned pipeline may lose and still be promoted
+    max_group_gap: float|None = None    # Group F2-score gap a pruned pipeline may not exceed, see utility_groups.max_group_gap_limit
+
+
+def environment_pruning_options() -> PruningOptions:
+    return PruningOptions(
+        min_importance=float(os.environ.get('HOMELESSNESS_PRUNE_MIN_IMPORTANCE', 0.005)),
+        max_correlation=float(os.environ.get('HOMELESSNESS_PRUNE_MAX_CORRELATION', 0.95)),
+        tolerance=float(os.environ.get('HOMELESSNESS_PRUNE_TOLERANCE', 0.0)),
+        max_group_gap=utility_groups.max_group_gap_limit()
+    )
+
+
+def kept_feature_mask(importance_array: np.ndarray, correlation_array: np.ndarray, min_importance: float, max_correlation: float) -> np.ndarray:
+    # Greedy, most important first: a feature is kept if it carries enough of the importance and is not
+    # collinear with a feature already kept; the most important feature is always kept
+    share_array = importance_array / importance_array.sum() if importance_array.sum() > 0 else np.ones_like(importance_array)
+    correlation_array = np.nan_to_num(np.abs(correlation_array))  # Constant columns correlate with nothing
+    kept_mask = np.zeros(importance_array.shape[0], dtype=bool)
+    for feature_idx in np.argsort(-share_array, kind='stable'):
+        if kept_mask.any() and (share_array[feature_idx] < min_importance or (correlation_array[feature_idx, kept_mask] > max_correlation).any()):
+            continue
+        kept_mask[feature_idx] = True
+    return kept_mask
+
+
+def f_scores_of(y_test: np.ndarray, y_test_pred: np.ndarray) -> tuple[float, float, float]:
+    return tuple(fbeta_score(y_test, y_test_pred, beta=beta, average='binary') for beta in utility_validation.F_BETA_LIST)
+
+
+def prune_pipelines(debiased_df: pd.DataFrame, options: PruningOptions, trace: utility_trace.StageTrace) -> list[str]:
+    # Prunes the {column}_lag_{k} features of every stored pipeline: features are ranked by their mean absolute
+    # SHAP value on the training rows under the stored model and pruned by kept_feature_mask. The pipeline is refit
+    # on the kept set with the same hyperparameters and replaces the stored one, with the kept set in its manifest,
+    # unless its F-score falls more than options.tolerance below the unpruned one or its group F2-scores drift further
+    # apart than options.max_group_gap. Returns the paths of the pipelines replaced; the next search can then run
+    # on the kept set only (HOMELESSNESS_SEARCH_KEPT_FEATURES=1, see utility_search.py)
+    print('== Setup ==')
+    trace.step('Setup')
+    last_year = int(debiased_df['year'].max())
+    identity_columns, majority_columns, data_columns = utility_features.split_columns(debiased_df)
+    threads = utility_xgboost.thread_budget()
+    print(f'Pruning: importance below {100 * options.min_importance:.2f}%, correlation above {options.max_correlation:.2f}, tolerance {100 * options.tolerance:.2f}%')
+    print('Max group gap:', 'none' if options.max_group_gap is None else f'{100 * options.max_group_gap:.2f}%')
+
+    pruned_path_list = list[str]()
+    dev_df_dict = dict[tuple[int, bool], pd.DataFrame]()
+    for k, pipeline_name in enumerate(utility_scoring.PIPELINE_NAME_LIST):
+        beta = pipeline_name[1:]
+        pipeline_path = utility_scoring.pipeline_path_of(pipeline_name)
+
+        print(f'== F{beta}-Score Pipeline ==')
+        trace.step(f'F{beta}-Score Pipeline', rows_in=debiased_df.shape[0])
+        with open(pipeline_path, 'rb') as pipeline_file:
+            scaler, model = tuple[StandardScaler, XGBClassifier](pickle.load(pipeline_file))
+        pipeline_data_columns, neighbor_weights = utility_spatial.pipeline_spatial_inputs_of(data_columns, scaler.feature_names_in_)
+        total_lags, feature_columns = utility_features.pipeline_features_of(pipeline_path, scaler.feature_names_in_, pipeline_data_columns)
+        model_params = {key: model.get_params()[key] for key in ['max_depth', 'n_estimators', 'learning_rate']}
+
+        # Preparing the dataset (the stored pipelines are trained on the years before last_year and tested on it)
+        dev_key = (total_lags, neighbor_weights is not None)
+        if dev_key not in dev_df_dict:
+            dev_df_dict[dev_key] = utility_features.build_lag_features(debiased_df, pipeline_data_columns, total_lags, majority_columns, neighbor_weights=neighbor_weights)
+        dev_df = dev_df_dict[dev_key]
+        train_df = dev_df[dev_df['year'] < last_year]
+        test_df = dev_df[dev_df['year'] == last_year]
+        y_train = train_df[utility_features.TARGET_COLUMN].values
+        y_test = test_df[utility_features.TARGET_COLUMN].values
+        trace.rows(train_df.shape[0] + test_df.shape[0])
+
+        # Before pruning: the stored pipeline as it is
+        X_train = utility_xgboost.to_float32(scaler.transform(train_df[feature_columns]))
+        before_f_scores = f_scores_of(y_test, model.predict(utility_xgboost.to_float32(scaler.transform(test_df[feature_columns]))))
+        print(f'  Before -> {len(feature_columns)} features, F0.5-Score {100 * before_f_scores[0]:.4f}%, F1-Score: {100 * before_f_scores[1]:.4f}%, F2-Score: {100 * before_f_scores[2]:.4f}%')
+
+        # Ranking and pruning; the last contribution column is the bias term
+        booster = model.get_booster()
+        booster.set_param({'nthread': threads})
+        contribution_array = booster.predict(xgboost.DMatrix(X_train, nthread=threads), pred_contribs=True)[:, :-1]
+        importance_array = np.abs(contribution_array).mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation_array = np.corrcoef(X_train, rowvar=False).reshape(len(feature_columns), len(feature_columns))
+        kept_columns = feature_columns[kept_feature_mask(importance_array, correlation_array, options.min_importance, options.max_correlation)]
+
+        # After pruning: refit on the kept set with the same hyperparameters
+        start = time.perf_counter()
+        kept_scaler = StandardScaler()
+        X_kept_train = utility_xgboost.to_float32(kept_scaler.fit_transform(train_df[kept_columns]))
+        kept_model = utility_xgboost.train_classifier(utility_xgboost.quantile_dmatrix(X_kept_train, y_train, threads), model_params, threads)
+        y_kept_test_pred = kept_model.predict(utility_xgboost.to_float32(kept_scaler.transform(test_df[kept_columns])))
+        after_f_scores = f_scores_of(y_test, y_kept_test_pred)
+        after_group_gap = float(utility_groups.max_group_gaps(utility_groups.grouped_f_scores(y_test, y_kept_test_pred[np.newaxis], utility_groups.group_code_array_of(test_df)))[0])
+        print(f'  After  -> {len(kept_columns)} features, F0.5-Score {100 * after_f_scores[0]:.4f}%, F1-Score: {100 * after_f_scores[1]:.4f}%, F2-Score: {100 * after_f_scores[2]:.4f}%, Max Group Gap (F2-Score): {100 * after_group_gap:.4f}% ({time.perf_counter() - start:.1f}s)')
+        print('  Pruned:', ', '.join(feature_columns.difference(kept_columns, sort=False)) or 'nothing')
+
+        # Promotion
+        if len(kept_columns) < len(feature_columns) and after_f_scores[k] >= before_f_scores[k] - options.tolerance and (options.max_group_gap is None or after_group_gap <= options.max_group_gap):
+            print('  Promoted: pruned pipeline')
+            with open(pipeline_path, 'wb') as pipeline_file:
+                pickle.dump((kept_scaler, kept_model), pipeline_file)
+            pruned_path_list.append(pipeline_path)
+            utility_features.update_manifest(
+                pipeline_path, total_lags, kept_columns,
+                max_group_gap=after_group_gap,
+                last_training_year=last_year - 1,
+                pruned_feature_columns=list(feature_columns.difference(kept_columns, sort=False)),
+                f_scores_before_pruning=dict(zip([f'F{beta}' for beta in utility_validation.F_BETA_LIST], before_f_scores)),
+                f_scores_after_pruning=dict(zip([f'F{beta}' for beta in utility_validation.F_BETA_LIST], after_f_scores))
+            )
+        else:
+            print('  Promoted: stored pipeline')
+    return pruned_path_list
@@ -0,0 +1,132 @@
+import os
+import re
+import pandas as pd
+import utility_region
+import utility_schema
+
+# SQL over the stage outputs without loading them into pandas: every transformed and prepared CSV of a
+# region is a DuckDB view typed with utility_schema, read lazily so only the projected columns and
+# matching rows are scanned. Views are named after their folder and file, e.g. prepared_04_debiased,
+# and live in a schema named after the region. Results come back as Arrow, as a table or a batch stream.
+DUCKDB_DTYPE_DICT = {
+    'int16': 'SMALLINT',
+    'int32': 'INTEGER',
+    'float32': 'FLOAT',
+    'category': 'VARCHAR'
+}
+STAGE_FOLDER_LIST = ['transformed', 'prepared']
+
+
+def view_name_of(stage_folder: str, file_name: str) -> str:
+    return f'{stage_folder}_{file_name[:-4]}'
+
+
+def sql_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_string(value: str) -> str:
+    # For the places DuckDB takes no bound parameters, such as view definitions and COPY targets
+    return "'" + value.replace("'", "''") + "'"
+
+
+def connect(region_list: list[utility_region.Region]|None = None):
+    # Views of the default region are also reachable without the schema prefix
+    import duckdb
+
+    region_list = region_list if region_list is not None else [utility_region.get_region(name) for name in utility_region.region_name_list()]
+    connection = duckdb.connect(':memory:')
+    for region in region_list:
+        connection.execute(f'CREATE SCHEMA IF NOT EXISTS {sql_identifier(region.name)}')
+        for stage_folder, folder_path in zip(STAGE_FOLDER_LIST, [region.transformed_folder_path, region.prepared_folder_path]):
+            if not os.path.isdir(folder_path):
+                continue
+            for file_name in sorted(os.listdir(folder_path)):
+                if not file_name.endswith('.csv'):
+                    continue
+                csv_path = os.path.join(folder_path, file_name)
+                dtype_dict = utility_schema.dtype_dict_of(pd.read_csv(csv_path, nrows=0).columns)
+                type_list = ', '.join(f'{sql_string(column)}: {sql_string(DUCKDB_DTYPE_DICT[dtype])}' for column, dtype in dtype_dict.items())
+                view_sql = f'SELECT * FROM read_csv({sql_string(csv_path)}, header = true, types = {{{type_list}}})'
+                connection.execute(f'CREATE VIEW {sql_identifier(region.name)}.{sql_identifier(view_name_of(stage_folder, file_name))} AS {view_sql}')
+                if region.name == utility_region.DEFAULT_REGION_NAME:
+                    connection.execute(f'CREATE VIEW {sql_identifier(view_name_of(stage_folder, file_name))} AS {view_sql}')
+    return connection
+
+
+def view_key_list(connection) -> list[tuple[str, str]]:
+    # (schema, view) of every registered view; the unprefixed views of the default region are in main
+    return connection.execute('SELECT schema_name, view_name FROM duckdb_views() WHERE NOT internal ORDER BY schema_name, view_name').fetchall()
+
+
+def table_name_list(connection) -> list[str]:
+    return [f'{schema}.{name}' for schema, name in view_key_list(connection)]
+
+
+def view_identifier_of(view_name: str, connection) -> str:
+    # The quoted, schema-qualified name of a view given as in table_name_list (los_angeles.prepared_04_debiased), quoted
+    # ("los_angeles"."prepared_04_debiased") or unprefixed for the default region (prepared_04_debiased)
+    part_list = [quoted_part.replace('""', '"') if quoted_part else part for quoted_part, part in re.findall(r'"((?:[^"]|"")*)"|([^.]+)', view_name)]
+    view_key = tuple(part_list) if len(part_list) == 2 else ('main', *part_list)
+    if view_key not in view_key_list(connection):
+        raise KeyError(f'Unknown view {view_name!r}; known views: {", ".join(table_name_list(connection))}')
+    return '.'.join(sql_identifier(part) for part in view_key)
+
+
+def arrow_table(result):
+    # DuckDB 1.4 moved .arrow() from returning a pyarrow.Table to returning a RecordBatchReader
+    arrow_result = result.arrow()
+    return arrow_result.read_all() if hasattr(arrow_result, 'read_all') else arrow_result
+
+
+def query(sql: str, connection=None, parameters: list|None = None):
+    # The whole result as a pyarrow.Table
+    connection = connection if connection is not None else connect()
+    return arrow_table(connection.execute(sql, parameters or []))
+
+
+def stream(sql: str, connection=None, parameters: list|None = None, batch_rows: int = 100_000):
+    # A pyarrow.RecordBatchReader, for results too large to hold at once
+    connection = connection if connection is not None else connect()
+    result = connection.execute(sql, parameters or [])
+    return result.to_arrow_reader(batch_rows) if hasattr(result, 'to_arrow_reader') else result.fetch_record_batch(batch_rows)
+
+
+def scan(view_name: str, column_list: list[str]|None = None, where: str|None = None, connection=None, parameters: list|None = None):
+    # Python-side projection and filter, both pushed into the CSV scan; columns are quoted, and the where
+    # expression can take its values as ? parameters
+    connection = connection if connection is not None else connect()
+    projection = '*' if column_list is None else ', '.join(sql_identifier(column) for column in column_list)
+    sql = f'SELECT {projection} FROM {view_identifier_of(view_name, connection)}'
+    if where is not None:
+        sql = f'{sql} WHERE {where}'
+    return query(sql, connection, parameters)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run SQL over the transformed and prepared outputs of every region.')
+    parser.add_argument('sql', nargs='?', help='Query to run, e.g. "SELECT year, SUM(tents_count) FROM prepared_04_debiased GROUP BY year"')
+    parser.add_argument('--regions', nargs='+', default=None, help='Regions to register (default: every configured region)')
+    parser.add_argument('--tables', action='store_true', help='List the registered views')
+    parser.add_argument('--output', help='Write the result to this .parquet, .arrow or .csv file instead of printing it')
+    args = parser.parse_args()
+
+    connection = connect([utility_region.get_region(name) for name in args.regions] if args.regions else None)
+    if args.tables or not args.sql:
+        print('\n'.join(table_name_list(connection)))
+        raise SystemExit(0)
+    if args.output is None:
+        print(query(args.sql, connection).to_pandas().to_string(index=False))
+    elif args.output.endswith('.parquet'):
+        connection.execute(f'COPY ({args.sql}) TO {sql_string(args.output)} (FORMAT parquet)')
+    elif args.output.endswith('.csv'):
+        connection.execute(f"COPY ({args.sql}) TO {sql_string(args.output)} (HEADER, DELIMITER ',')")
+    else:
+        import pyarrow
+
+        reader = stream(args.sql, connection)
+        with pyarrow.OSFile(args.output, 'wb') as output_file, pyarrow.ipc.new_file(output_file, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
@@ -0,0 +1,35 @@
+import pandas as pd
+
+# Parsers of the raw extracts, one per source, shared by the transform stages. utility_cache.cached_frame keys
+# its cache on a parser's source, so a fix here invalidates the cached frames of every stage using it.
+
+
+def load_acs_file(raw_path: str, zip_code_sr: pd.Series) -> pd.DataFrame:
+    # An ACS table (income, poverty, employment, rent, tenure, age and sex, ethnicity) restricted to the region's ZIP codes
+    raw_df = pd.read_csv(raw_path, low_memory=False)
+    raw_df['zip_code'] = raw_df['NAME'].str.extract(r'ZCTA5 (\d{5})')[0].astype(str).str.zfill(5)
+    raw_df = raw_df[raw_df['zip_code'].isin(zip_code_sr)]
+    for column_name in raw_df.columns:
+        if column_name.endswith('E'):  # Only estimate columns
+            raw_df[column_name] = pd.to_numeric(raw_df[column_name], errors='coerce').astype(float)
+    return raw_df
+
+
+def load_homeless_count_file(raw_path: str, county_fips: str) -> pd.DataFrame:
+    # A homeless count by census tract, with the tracts as full 11-digit FIPS codes
+    raw_df = pd.read_csv(raw_path, low_memory=False, dtype=str)
+    raw_df['tract'] = county_fips + raw_df['tract'].str.zfill(6)
+    return raw_df
+
+
+def load_crime_file(raw_path: str, zip_gdf) -> pd.DataFrame:
+    # Crime incidents joined to the ZIP code polygon containing them; the spatial join is the slow part, so the cached frame is taken after it
+    from shapely.geometry import Point
+    import geopandas as gpd
+
+    raw_df = pd.read_csv(raw_path, low_memory=False)
+    raw_df = raw_df[(raw_df['LAT'] != 0.0) & (raw_df['LON'] != 0.0)]
+    raw_df = raw_df[raw_df['Date Rptd'].notna()]
+    raw_gdf = gpd.GeoDataFrame(raw_df, geometry=[Point(xy) for xy in zip(raw_df['LON'], raw_df['LAT'])], crs='EPSG:4326')
+    raw_gdf:gpd.GeoDataFrame = gpd.sjoin(raw_gdf, zip_gdf, how='left', predicate='within')
+    return pd.DataFrame(raw_gdf.drop(columns='geometry'))
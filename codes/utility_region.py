@@ -0,0 +1,133 @@
+import dataclasses
+import json
+import os
+import pandas as pd
+import utility_schema
+
+BASE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_ROOT = os.path.join(BASE_ROOT, 'data')
+# Optional extra regions, e.g. {"san_diego": {"zip_shape_file": "utility/shape_files/San_Diego_Zip_Codes.shp", "county_fips": "06073"}}
+REGION_CONFIG_PATH = os.path.join(DATA_ROOT, 'utility', 'regions.json')
+
+REGION_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_REGION'
+REGIONS_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_REGIONS'
+DEFAULT_REGION_NAME = 'los_angeles'
+
+# Paths are relative to DATA_ROOT; the default region keeps the original flat layout
+DEFAULT_REGION_DICT = {
+    DEFAULT_REGION_NAME: {
+        'zip_shape_file': os.path.join('utility', 'shape_files', 'City_of_Los_Angeles_Zip_Codes.shp'),
+        'county_fips': '06037',
+        'output_root': '',
+        'local_raw_data_root': 'raw'
+    }
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class Region:
+    name: str
+    zip_shape_file_path: str
+    county_fips: str
+    raw_data_root: str          # National extracts shared by every region (ACS tables, HUD crosswalk)
+    local_raw_data_root: str    # Region-specific extracts (crime incidents)
+    output_root: str            # Partition holding the region's crosswalk, counts and stage outputs
+    zip_code_column: str = 'ZCTA5CE10'
+
+    @property
+    def crosswalk_folder_path(self) -> str:
+        return os.path.join(self.output_root, 'utility', 'crosswalk_files')
+
+    @property
+    def homeless_count_folder_path(self) -> str:
+        return os.path.join(self.output_root, 'utility', 'homeless_count_files')
+
+    @property
+    def transformed_folder_path(self) -> str:
+        return os.path.join(self.output_root, 'transformed')
+
+    @property
+    def prepared_folder_path(self) -> str:
+        return os.path.join(self.output_root, 'prepared')
+
+    def raw_data_folder_path(self, dataset_name: str) -> str:
+        return os.path.join(self.raw_data_root, dataset_name)
+
+    def local_raw_data_folder_path(self, dataset_name: str) -> str:
+        return os.path.join(self.local_raw_data_root, dataset_name)
+
+    def read_zip_codes(self) -> pd.Series:
+        # Geopandas is only needed by the stages that actually touch the shape file
+        import geopandas as gpd
+
+        zip_gdf: gpd.GeoDataFrame = gpd.read_file(self.zip_shape_file_path, columns=[self.zip_code_column], ignore_geometry=True)
+        return zip_gdf[self.zip_code_column].astype(str).str.zfill(5)
+
+    def read_zip_shapes(self):
+        import geopandas as gpd
+
+        zip_gdf: gpd.GeoDataFrame = gpd.read_file(self.zip_shape_file_path)
+        zip_gdf = zip_gdf.rename(columns={self.zip_code_column: 'ZCTA5CE10'})
+        zip_gdf['ZCTA5CE10'] = zip_gdf['ZCTA5CE10'].astype(str).str.zfill(5)
+        return zip_gdf
+
+
+def region_config_dict() -> dict[str, dict[str, str]]:
+    region_dict = {name: dict(config) for name, config in DEFAULT_REGION_DICT.items()}
+    if os.path.exists(REGION_CONFIG_PATH):
+        with open(REGION_CONFIG_PATH) as config_file:
+            for name, config in json.load(config_file).items():
+                region_dict[name] = {**region_dict.get(name, {}), **config}
+    return region_dict
+
+
+def region_name_list() -> list[str]:
+    return list(region_config_dict())
+
+
+def get_region(name: str|None = None) -> Region:
+    name = name or os.environ.get(REGION_ENVIRONMENT_VARIABLE, DEFAULT_REGION_NAME)
+    region_dict = region_config_dict()
+    if name not in region_dict:
+        raise KeyError(f'Unknown region {name!r}; known regions: {", ".join(region_dict)}')
+    config = region_dict[name]
+    for key in ['zip_shape_file', 'county_fips']:
+        if key not in config:
+            raise KeyError(f'Region {name!r} is missing {key!r} in {REGION_CONFIG_PATH}')
+    output_root = os.path.join(DATA_ROOT, config.get('output_root', os.path.join('regions', name)))
+    return Region(
+        name=name,
+        zip_shape_file_path=os.path.join(DATA_ROOT, config['zip_shape_file']),
+        county_fips=config['county_fips'],
+        raw_data_root=os.path.join(DATA_ROOT, config.get('raw_data_root', 'raw')),
+        local_raw_data_root=os.path.join(DATA_ROOT, config.get('local_raw_data_root', os.path.join(output_root, 'raw'))),
+        output_root=output_root,
+        zip_code_column=config.get('zip_code_column', 'ZCTA5CE10')
+    )
+
+
+def modeling_region_list() -> list[Region]:
+    # Regions merged at the modeling step: an explicit list, or every region with a finished partition
+    if os.environ.get(REGIONS_ENVIRONMENT_VARIABLE):
+        return [get_region(name.strip()) for name in os.environ[REGIONS_ENVIRONMENT_VARIABLE].split(',') if name.strip()]
+    if os.environ.get(REGION_ENVIRONMENT_VARIABLE):
+        return [get_region()]
+    region_list = [get_region(name) for name in region_name_list()]
+    return [region for region in region_list if os.path.exists(os.path.join(region.prepared_folder_path, '04_debiased.csv'))]
+
+
+def read_debiased(region_list: list[Region]|None = None) -> pd.DataFrame:
+    region_list = region_list if region_list is not None else modeling_region_list()
+    if not region_list:
+        raise FileNotFoundError('No region has a prepared 04_debiased.csv partition')
+    debiased_df_list = list[pd.DataFrame]()
+    for region in region_list:
+        debiased_path = os.path.join(region.prepared_folder_path, '04_debiased.csv')
+        debiased_df_list.append(utility_schema.read_csv(debiased_path))
+    debiased_df = pd.concat(debiased_df_list, ignore_index=True)
+    if len(region_list) > 1:
+        # A ZIP code crossing region borders is kept once, from the first region listing it
+        total_rows = debiased_df.shape[0]
+        debiased_df = debiased_df.drop_duplicates(subset=['year', 'zip_code'], keep='first')
+        print(f'Merged regions: {", ".join(region.name for region in region_list)} ({total_rows - debiased_df.shape[0]} duplicated rows dropped)')
+    return debiased_df.sort_values(['year', 'zip_code']).reset_index(drop=True)
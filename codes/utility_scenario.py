@@ -0,0 +1,145 @@
+import dataclasses
+import json
+import numpy as np
+import pandas as pd
+import utility_groups
+import utility_spatial
+import utility_xgboost
+
+OPERATION_LIST = ['scale', 'shift', 'set']
+
+
+@dataclasses.dataclass(frozen=True)
+class Perturbation:
+    column: str                         # Data column of the debiased dataset, e.g. median_gross_rent
+    operation: str                      # scale (multiply), shift (add) or set
+    value: float
+    zip_code_list: list[int]|None = None    # ZIP codes it applies to (default: all)
+    lag_list: tuple[int, ...] = (0,)    # Lags it applies to (default: the scored year only)
+
+
+@dataclasses.dataclass(frozen=True)
+class Scenario:
+    name: str
+    perturbation_list: list[Perturbation]
+
+
+def read_scenarios(scenario_path: str) -> list[Scenario]:
+    # {"rent_up_10": [{"column": "median_gross_rent", "scale": 1.1}, {"column": "unemployment_rate", "shift": 2, "zip_codes": [90012]}], ...}
+    with open(scenario_path) as scenario_file:
+        scenario_dict = json.load(scenario_file)
+    scenario_list = list[Scenario]()
+    for name, perturbation_dict_list in scenario_dict.items():
+        perturbation_list = list[Perturbation]()
+        for perturbation_dict in perturbation_dict_list:
+            operation_list = [operation for operation in OPERATION_LIST if operation in perturbation_dict]
+            if len(operation_list) != 1:
+                raise ValueError(f'Scenario {name}: every perturbation needs exactly one of {", ".join(OPERATION_LIST)}')
+            perturbation_list.append(Perturbation(
+                column=perturbation_dict['column'],
+                operation=operation_list[0],
+                value=float(perturbation_dict[operation_list[0]]),
+                zip_code_list=perturbation_dict.get('zip_codes'),
+                lag_list=tuple(perturbation_dict.get('lags', [0]))
+            ))
+        scenario_list.append(Scenario(name, perturbation_list))
+    return scenario_list
+
+
+def scenario_matrix(base_df: pd.DataFrame, feature_columns: pd.Index, scenario_list: list[Scenario], debiased_df: pd.DataFrame|None = None, neighbor_weights=None) -> np.ndarray:
+    # (scenario x ZIP code) rows: the base matrix repeated once per scenario, each block perturbed in place; the neighbor
+    # features of spatial pipelines (given debiased_df and neighbor_weights) are then derived again from the perturbed values
+    X_base = base_df[feature_columns].values.astype(np.float64)
+    X_stack = np.repeat(X_base[np.newaxis], len(scenario_list), axis=0)
+    zip_code_array = base_df['zip_code'].values
+    for scenario_idx, scenario in enumerate(scenario_list):
+        for perturbation in scenario.perturbation_list:
+            if perturbation.column.endswith(utility_spatial.NEIGHBOR_SUFFIX):
+                raise ValueError(f'Scenario {scenario.name}: {perturbation.column} is derived from the neighbors\' {perturbation.column[:-len(utility_spatial.NEIGHBOR_SUFFIX)]}, perturb that instead')
+            if f'{perturbation.column}_lag_0' not in base_df.columns:
+                raise ValueError(f'Scenario {scenario.name}: {perturbation.column} is not a data column')
+            # Features pruned from the pipeline (see select_features.py) cannot move its predictions
+            column_idx = feature_columns.get_indexer([f'{perturbation.column}_lag_{lag}' for lag in perturbation.lag_list])
+            column_idx = column_idx[column_idx >= 0]
+            if perturbation.zip_code_list is None:
+                row_idx = np.arange(X_base.shape[0])
+            else:
+                row_idx = np.flatnonzero(np.isin(zip_code_array, perturbation.zip_code_list))
+            block_idx = np.ix_(row_idx, column_idx)
+            if perturbation.operation == 'scale':
+                X_stack[scenario_idx][block_idx] *= perturbation.value
+            elif perturbation.operation == 'shift':
+                X_stack[scenario_idx][block_idx] += perturbation.value
+            else:
+                X_stack[scenario_idx][block_idx] = perturbation.value
+    if neighbor_weights is not None:
+        rederive_neighbor_features(X_stack, base_df, feature_columns, scenario_list, debiased_df, neighbor_weights)
+    return X_stack.reshape(-1, X_base.shape[1])
+
+
+def rederive_neighbor_features(X_stack: np.ndarray, base_df: pd.DataFrame, feature_columns: pd.Index, scenario_list: list[Scenario], debiased_df: pd.DataFrame, neighbor_weights) -> None:
+    # {column}_neighbor_lag_{k} of a scenario moving column: utility_spatial.add_neighbor_columns over the scored years of
+    # debiased_df with the scenario applied, written into X_stack's feature blocks in place. Lag k of the scored year is
+    # the year k years earlier, as on the prepared grid of every year and ZIP code
+    scored_year = int(base_df['year'].iloc[0])
+    neighbor_columns = utility_spatial.neighbor_columns_of(utility_spatial.NEIGHBOR_COLUMNS)
+    neighbor_feature_list = [(feature_idx, column, int(feature_column.rsplit('_lag_', 1)[1]))
+                             for feature_idx, feature_column in enumerate(feature_columns)
+                             for column in neighbor_columns if feature_column.rsplit('_lag_', 1)[0] == column]
+    if not neighbor_feature_list:
+        return
+    neighbor_columns = pd.Index(sorted({column for _, column, _ in neighbor_feature_list}, key=list(neighbor_columns).index))
+    source_columns = [column[:-len(utility_spatial.NEIGHBOR_SUFFIX)] for column in neighbor_columns]
+    year_list = sorted({scored_year - lag for _, _, lag in neighbor_feature_list})
+    window_df = debiased_df.loc[debiased_df['year'].isin(year_list), ['year', 'zip_code', *source_columns]].reset_index(drop=True)
+    zip_code_array = base_df['zip_code'].values
+    for scenario_idx, scenario in enumerate(scenario_list):
+        # Scenarios leaving every source column alone keep the stored neighbor features
+        perturbation_list = [perturbation for perturbation in scenario.perturbation_list if perturbation.column in source_columns]
+        if not perturbation_list:
+            continue
+        scenario_df = window_df.copy()
+        for perturbation in perturbation_list:
+            row_mask = scenario_df['zip_code'].isin(zip_code_array if perturbation.zip_code_list is None else perturbation.zip_code_list) \
+                & scenario_df['year'].isin([scored_year - lag for lag in perturbation.lag_list])
+            if perturbation.operation == 'scale':
+                scenario_df.loc[row_mask, perturbation.column] *= perturbation.value
+            elif perturbation.operation == 'shift':
+                scenario_df.loc[row_mask, perturbation.column] += perturbation.value
+            else:
+                scenario_df.loc[row_mask, perturbation.column] = perturbation.value
+        neighbor_df = utility_spatial.add_neighbor_columns(scenario_df, neighbor_columns, neighbor_weights).set_index(['year', 'zip_code'])
+        for feature_idx, column, lag in neighbor_feature_list:
+            X_stack[scenario_idx][:, feature_idx] = neighbor_df[column].reindex(pd.MultiIndex.from_arrays([np.full(zip_code_array.size, scored_year - lag), zip_code_array])).values
+
+
+def score_scenarios(scaler, model, base_df: pd.DataFrame, feature_columns: pd.Index, scenario_list: list[Scenario], threshold_dict: dict[tuple[str, str], float], debiased_df: pd.DataFrame|None = None, neighbor_weights=None) -> pd.DataFrame:
+    # Every scenario scaled and scored in one batched predict_proba call; flags use the 0.5 threshold
+    # overridden by the per-group ones, as debiased predictions do. The unperturbed baseline is scored alongside.
+    scenario_list = [Scenario('baseline', [])] + scenario_list
+    total_zip_codes = base_df.shape[0]
+    X = scenario_matrix(base_df, feature_columns, scenario_list, debiased_df, neighbor_weights)
+    X = utility_xgboost.to_float32(scaler.transform(pd.DataFrame(X, columns=feature_columns)))
+    y_prob = model.predict_proba(X)[:, 1]
+    mask_dict = {key: np.tile(group_mask, len(scenario_list)) for key, group_mask in utility_groups.group_mask_dict(base_df).items()}
+    y_pred = utility_groups.apply_group_thresholds(y_prob, (y_prob > 0.5).astype(int), mask_dict, threshold_dict)
+    scenario_df = pd.DataFrame({
+        'scenario': np.repeat([scenario.name for scenario in scenario_list], total_zip_codes),
+        'zip_code': np.tile(base_df['zip_code'].values, len(scenario_list)),
+        'probability': y_prob,
+        'flagged': y_pred,
+        'baseline_probability': np.tile(y_prob[:total_zip_codes], len(scenario_list)),
+        'baseline_flagged': np.tile(y_pred[:total_zip_codes], len(scenario_list))
+    })
+    scenario_df['flipped'] = scenario_df['flagged'] - scenario_df['baseline_flagged']  # 1: becomes at-risk, -1: stops being at-risk
+    return scenario_df.iloc[total_zip_codes:].reset_index(drop=True)
+
+
+def summarize_scenarios(scenario_df: pd.DataFrame) -> pd.DataFrame:
+    scenario_df = scenario_df.assign(probability_change=scenario_df['probability'] - scenario_df['baseline_probability'])
+    return scenario_df.groupby('scenario', sort=False).agg(
+        flagged=pd.NamedAgg(column='flagged', aggfunc='sum'),
+        newly_flagged=pd.NamedAgg(column='flipped', aggfunc=lambda x: (x == 1).sum()),
+        no_longer_flagged=pd.NamedAgg(column='flipped', aggfunc=lambda x: (x == -1).sum()),
+        mean_probability_change=pd.NamedAgg(column='probability_change', aggfunc='mean')
+    )
@@ -0,0 +1,81 @@
+import pandas as pd
+
+# Narrowest safe dtype of every column the transform_* and prepare_* stages produce. Measures are counts,
+# dollar amounts and rates well inside float32's 7 significant digits; years and ZIP codes fit int16 and int32.
+IDENTITY_DTYPE_DICT = {
+    'year': 'int16',
+    'zip_code': 'int32'
+}
+MEASURE_COLUMN_LIST = [
+    'cars_count', 'vans_count', 'campers_or_rvs_count', 'tents_count', 'homeless_individuals_count',
+    'median_income', 'below_poverty_level_individuals_count', 'unemployment_rate', 'median_gross_rent',
+    'housing_units_count', 'owner_occupied_housing_units_count', 'renter_occupied_housing_units_count',
+    'population', 'crimes_count', 'victims_count'
+]
+MEASURE_DTYPE = 'float32'
+CATEGORY_COLUMN_LIST = ['gender_majority', 'age_majority', 'ethnicity_majority']
+# Group breakdowns ({measure}_{term}) the debias stage replaces by each ZIP code's {group}_majority
+BIAS_TERM_DICT = {
+    'gender': ['male', 'female'],
+    'age': ['age_below_24', 'age_between_25_44', 'age_above_45'],
+    'ethnicity': ['white', 'black', 'hispanic', 'other_races']
+}
+# The crosswalk keeps ZIP codes and tracts as zero-padded strings, since they are matched as text
+CROSSWALK_DTYPE_DICT = {
+    'quarter': 'category',
+    'zip_code': 'category',
+    'tract': 'category'
+}
+
+
+def dtype_of(column: str) -> str|None:
+    if column in IDENTITY_DTYPE_DICT:
+        return IDENTITY_DTYPE_DICT[column]
+    if column in CATEGORY_COLUMN_LIST:
+        return 'category'
+    # Group breakdowns such as median_income_female share their measure's dtype
+    if any(column == measure_column or column.startswith(f'{measure_column}_') for measure_column in MEASURE_COLUMN_LIST):
+        return MEASURE_DTYPE
+    return None
+
+
+def dtype_dict_of(column_list) -> dict[str, str]:
+    dtype_dict = {column: dtype_of(column) for column in column_list}
+    return {column: dtype for column, dtype in dtype_dict.items() if dtype is not None}
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    return df.astype(dtype_dict_of(df.columns))
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(index=True, deep=True).sum() / 2 ** 20
+
+
+def default_memory_mb(df: pd.DataFrame) -> float:
+    # What the same frame takes with pandas' default inference: 64-bit numbers and object strings
+    default_dtype_dict = dict[str, str]()
+    for column, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            default_dtype_dict[column] = 'object'
+        elif pd.api.types.is_float_dtype(dtype):
+            default_dtype_dict[column] = 'float64'
+        elif pd.api.types.is_integer_dtype(dtype):
+            default_dtype_dict[column] = 'int64'
+    return memory_mb(df.astype(default_dtype_dict))
+
+
+def read_csv(path: str, dtype_dict: dict[str, str]|None = None) -> pd.DataFrame:
+    # Parses straight into the narrow dtypes instead of converting after a float64/object read
+    if dtype_dict is None:
+        dtype_dict = dtype_dict_of(pd.read_csv(path, nrows=0).columns)
+    return pd.read_csv(path, low_memory=False, dtype=dtype_dict)
+
+
+def to_csv(df: pd.DataFrame, path: str, dtype_dict: dict[str, str]|None = None) -> pd.DataFrame:
+    # Writes the frame in its schema dtypes and reports the memory they save over default inference
+    schema_df = df.astype(dtype_dict) if dtype_dict is not None else apply_schema(df)
+    before_mb, after_mb = default_memory_mb(schema_df), memory_mb(schema_df)
+    print(f'Memory: {before_mb:.2f} MB -> {after_mb:.2f} MB ({100 * (1 - after_mb / before_mb) if before_mb > 0 else 0.0:.1f}% saved)')
+    schema_df.to_csv(path, index=False)
+    return schema_df
@@ -0,0 +1,90 @@
+from sklearn.metrics import fbeta_score
+import dataclasses
+import os
+import pickle
+import pandas as pd
+import utility_features
+import utility_groups
+import utility_spatial
+import utility_validation
+import utility_xgboost
+
+BASE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_ROOT = os.path.join(BASE_ROOT, 'models')
+
+PIPELINE_NAME_LIST = ['f0_5', 'f1', 'f2']
+
+
+@dataclasses.dataclass(frozen=True)
+class Pipeline:
+    name: str
+    scaler: object          # StandardScaler
+    model: object           # XGBClassifier
+    total_lags: int
+    feature_columns: pd.Index
+    data_columns: pd.Index  # The debiased dataset's data columns, plus the neighbor columns of spatial pipelines
+    neighbor_weights: object    # utility_spatial.NeighborWeights of spatial pipelines, None otherwise
+
+
+def pipeline_path_of(pipeline_name: str) -> str:
+    return os.path.join(MODEL_ROOT, f'xgboost_{pipeline_name}_score.pickle')
+
+
+def load_pipeline(pipeline_name: str, data_columns: pd.Index) -> Pipeline:
+    pipeline_path = pipeline_path_of(pipeline_name)
+    with open(pipeline_path, 'rb') as pipeline_file:
+        scaler, model = pickle.load(pipeline_file)
+    model.set_params(n_jobs=utility_xgboost.thread_budget())
+    data_columns, neighbor_weights = utility_spatial.pipeline_spatial_inputs_of(data_columns, scaler.feature_names_in_)
+    total_lags, feature_columns = utility_features.pipeline_features_of(pipeline_path, scaler.feature_names_in_, data_columns)
+    return Pipeline(pipeline_name, scaler, model, total_lags, feature_columns, data_columns, neighbor_weights)
+
+
+def test_key_of(pipeline: Pipeline) -> tuple[int, bool]:
+    return pipeline.total_lags, pipeline.neighbor_weights is not None
+
+
+def test_frames_of(debiased_df: pd.DataFrame, pipeline_list: list[Pipeline], year: int) -> dict[tuple[int, bool], pd.DataFrame]:
+    # One feature matrix per distinct total_lags (and spatial or not), shared by every pipeline using it
+    identity_columns, majority_columns, data_columns = utility_features.split_columns(debiased_df)
+    test_df_dict = dict[tuple[int, bool], pd.DataFrame]()
+    for pipeline in pipeline_list:
+        if test_key_of(pipeline) not in test_df_dict:
+            dev_df = utility_features.build_lag_features(debiased_df, pipeline.data_columns, pipeline.total_lags, majority_columns, neighbor_weights=pipeline.neighbor_weights)
+            test_df_dict[test_key_of(pipeline)] = dev_df[dev_df['year'] == year].reset_index(drop=True)
+    return test_df_dict
+
+
+def score_pipeline(pipeline: Pipeline, test_df: pd.DataFrame) -> tuple[dict[str, float], pd.DataFrame]:
+    # Overall F-scores and group F2-scores before and after debiasing, and the per-ZIP predictions
+    X_test = utility_xgboost.to_float32(pipeline.scaler.transform(test_df[pipeline.feature_columns]))
+    y_test = test_df[utility_features.TARGET_COLUMN].values
+    y_prob = pipeline.model.predict_proba(X_test)[:, 1]
+    y_test_pred = (y_prob > 0.5).astype(int)
+    group_mask_dict = utility_groups.group_mask_dict(test_df)
+    y_test_debiased_pred = utility_groups.debiased_predictions(y_test, y_prob, y_test_pred, group_mask_dict)
+
+    score_dict = dict[str, float]()
+    for beta in utility_validation.F_BETA_LIST:
+        score_dict[f'F{beta}-Score'] = fbeta_score(y_test, y_test_pred, beta=beta, average='binary')
+    for label, y_pred in [('before', y_test_pred), ('after', y_test_debiased_pred)]:
+        for (group_name, term), group_f2_score in utility_groups.group_f_scores(y_test, y_pred, group_mask_dict).items():
+            score_dict[f'{group_name}/{term} F2-Score ({label} debiasing)'] = group_f2_score
+    prediction_df = pd.DataFrame({
+        f'{pipeline.name}_probability': y_prob,
+        f'{pipeline.name}_prediction': y_test_pred,
+        f'{pipeline.name}_debiased_prediction': y_test_debiased_pred
+    }, index=pd.MultiIndex.from_frame(test_df[['year', 'zip_code']]))
+    return score_dict, prediction_df
+
+
+def score_pipelines(debiased_df: pd.DataFrame, pipeline_list: list[Pipeline], year: int|None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Returns the side-by-side scores (one column per pipeline) and predictions (one row per ZIP code) of a year, the last by default
+    year = year if year is not None else int(debiased_df['year'].max())
+    test_df_dict = test_frames_of(debiased_df, pipeline_list, year)
+    score_dict = dict[str, dict[str, float]]()
+    prediction_df_list = list[pd.DataFrame]()
+    for pipeline in pipeline_list:
+        score_dict[pipeline.name], prediction_df = score_pipeline(pipeline, test_df_dict[test_key_of(pipeline)])
+        prediction_df_list.append(prediction_df)
+    return pd.DataFrame(score_dict), pd.concat(prediction_df_list, axis=1).reset_index()
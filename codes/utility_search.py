@@ -0,0 +1,202 @@
+from xgboost import XGBClassifier
+from sklearn.preprocessing import StandardScaler
+from skopt import gp_minimize
+from skopt.space import Integer, Real
+import dataclasses
+import os
+import pickle
+import numpy as np
+import pandas as pd
+import utility_features
+import utility_groups
+import utility_scoring
+import utility_spatial
+import utility_trace
+import utility_validation
+
+KEPT_FEATURES_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_SEARCH_KEPT_FEATURES'
+
+
+@dataclasses.dataclass(frozen=True)
+class SearchOptions:
+    validation_mode: str = 'holdout'    # See utility_validation.fold_list_of
+    total_folds: int = 3
+    fold_workers: int = 1
+    max_group_gap: float|None = None    # Fairness-aware selection: the best trial whose group F2-scores on the last fold are at most this far apart
+    spatial: bool = False               # Neighbor features, see utility_spatial
+    kept_features: bool = False         # Train only on the data columns the stored pipelines' manifests keep, see select_features.py
+    n_calls: int = 60
+
+
+@dataclasses.dataclass(frozen=True)
+class SearchResult:
+    last_year: int
+    pipeline_list: list[tuple[StandardScaler, XGBClassifier]]     # The best pipeline per F-beta, in PIPELINE_NAME_LIST order
+    params_list: list[tuple[int, int, int, float]]                 # Its total_lags, max_depth, n_estimators and learning_rate
+    f_scores_list: list[tuple[float, float, float]]
+    group_gap_list: list[float]
+    trial_array_dict: dict[str, np.ndarray]                        # Every trial's parameters, scores and last-fold probabilities, per total_lags
+
+
+def environment_search_options() -> SearchOptions:
+    return SearchOptions(
+        validation_mode=utility_validation.validation_mode(),
+        total_folds=int(os.environ.get(utility_validation.TOTAL_FOLDS_ENVIRONMENT_VARIABLE, 3)),
+        fold_workers=int(os.environ.get(utility_validation.FOLD_WORKERS_ENVIRONMENT_VARIABLE, os.cpu_count() or 1)),
+        max_group_gap=utility_groups.max_group_gap_limit(),
+        spatial=utility_spatial.spatial_enabled(),
+        kept_features=os.environ.get(KEPT_FEATURES_ENVIRONMENT_VARIABLE) == '1'
+    )
+
+
+def search_pipelines(debiased_df: pd.DataFrame, options: SearchOptions, trace: utility_trace.StageTrace) -> SearchResult:
+    # Bayesian search over total_lags and the XGBoost hyperparameters, keeping the best pipeline per F-beta;
+    # nothing is written, see store_pipelines
+    print('== Setup ==')
+    trace.step('Setup')
+    last_year = int(debiased_df['year'].max())
+    identity_columns, majority_columns, data_columns = utility_features.split_columns(debiased_df)
+    neighbor_weights = None
+    if options.spatial:
+        neighbor_weights = utility_spatial.neighbor_weights()
+        data_columns = data_columns.append(utility_spatial.neighbor_columns_of(data_columns))
+        print('Spatial features:', ', '.join(utility_spatial.neighbor_columns_of(data_columns)))
+    search_data_columns = data_columns
+    if options.kept_features:
+        # Lag frames are still built from every data column, since the target needs the homeless count
+        search_data_columns = utility_features.kept_data_columns_of([utility_scoring.pipeline_path_of(pipeline_name) for pipeline_name in utility_scoring.PIPELINE_NAME_LIST], data_columns)
+        print(f'Kept features: {len(search_data_columns)} of {len(data_columns)} data columns, dropped', ', '.join(data_columns.difference(search_data_columns, sort=False)) or 'nothing')
+    print('Max group gap:', 'none' if options.max_group_gap is None else f'{100 * options.max_group_gap:.2f}%')
+    print('Validation:', f'{options.validation_mode} ({options.total_folds} folds, {options.fold_workers} workers)' if options.validation_mode == 'rolling_origin' else options.validation_mode)
+
+    print('== Hyperparameter Search Space ==')
+    trace.step('Hyperparameter Search Space')
+    space_dict = [
+        Integer(0, 3, name='total_lags'),
+        Integer(6, 9, name='max_depth'),
+        Integer(180, 220, name='n_estimators'),
+        Real(0.0005, 0.0015, name='learning_rate')
+    ]
+
+    print('== Bayesian Hyperparameter Search ==')
+    # Preparing the dataset and its standardized folds for every total_lags of the space up front, shared by every
+    # trial, so the fold workers fork once with all of them and only ever receive fold keys
+    trace.step('Fold Preparation', rows_in=debiased_df.shape[0])
+    utility_validation.reset_fold_cache()
+    fold_data_dict = dict[int, list[utility_validation.FoldData]]()
+    test_zip_code_dict = dict[int, np.ndarray]()
+    for total_lags in range(space_dict[0].low, space_dict[0].high + 1):
+        dev_df = utility_features.build_lag_features(debiased_df, data_columns, total_lags, majority_columns, neighbor_weights=neighbor_weights)
+        fold_list = utility_validation.fold_list_of(dev_df, last_year, options.validation_mode, options.total_folds)
+        test_zip_code_dict[total_lags] = dev_df['zip_code'].values[fold_list[-1][1]]
+        feature_columns = utility_features.feature_columns_of(search_data_columns, total_lags)
+        fold_data_dict[total_lags] = utility_validation.prepare_folds(dev_df, feature_columns, utility_features.TARGET_COLUMN, fold_list, key=(total_lags,))
+
+    results_dict = dict[tuple[int, int, int, float], tuple[StandardScaler, XGBClassifier, tuple[float, float, float], np.ndarray]]()
+    def objective(params: tuple[int, int, int, float]) -> float:
+
+        # Getting the hyperparameters
+        total_lags, max_depth, n_estimators, learning_rate = params
+        trace.step(f'Trial {len(results_dict) + 1}', rows_in=debiased_df.shape[0], total_lags=int(total_lags), max_depth=int(max_depth), n_estimators=int(n_estimators), learning_rate=float(learning_rate))
+        print(f'Trial {len(results_dict) + 1} -> total_lags: {total_lags}, max_depth: {max_depth}, n_estimators: {n_estimators}, learning_rate: {learning_rate:.6f}')
+
+        # The standardized folds of this total_lags
+        fold_data_list = fold_data_dict[total_lags]
+        trace.rows(sum(fold_data.X_train.shape[0] + fold_data.X_test.shape[0] for fold_data in fold_data_list))
+
+        # Train, predict and score every fold
+        model_params = {'max_depth': max_depth, 'n_estimators': n_estimators, 'learning_rate': learning_rate}
+        fold_result_list = utility_validation.fit_folds(fold_data_list, model_params, options.fold_workers)
+
+        # Metrics (averaged over the folds; the stored pipeline is the one tested on last_year)
+        for fold_data, (_, _, train_f_scores, test_f_scores, _, _) in zip(fold_data_list, fold_result_list):
+            if len(fold_data_list) > 1:
+                print(f'  Fold {fold_data.test_year}')
+            print(f'  Train -> F0.5-Score {100 * train_f_scores[0]:.4f}%, F1-Score: {100 * train_f_scores[1]:.4f}%, F2-Score: {100 * train_f_scores[2]:.4f}%')
+            print(f'  Test  -> F0.5-Score {100 * test_f_scores[0]:.4f}%, F1-Score: {100 * test_f_scores[1]:.4f}%, F2-Score: {100 * test_f_scores[2]:.4f}%')
+        scaler, model, _, _, y_test_prob, _ = fold_result_list[-1]
+        test_f_scores = tuple(float(sum(fold_result[3][k] for fold_result in fold_result_list) / len(fold_result_list)) for k in range(len(utility_validation.F_BETA_LIST)))
+        if len(fold_data_list) > 1:
+            print(f'  Mean  -> F0.5-Score {100 * test_f_scores[0]:.4f}%, F1-Score: {100 * test_f_scores[1]:.4f}%, F2-Score: {100 * test_f_scores[2]:.4f}%')
+
+        # Return
+        results_dict[tuple(params)] = (scaler, model, test_f_scores, y_test_prob)
+        return -sum(test_f_scores)
+
+    gp_minimize(
+        func=objective,
+        dimensions=space_dict,
+        acq_func='EI',      # Expected Improvement
+        n_calls=options.n_calls,
+        n_random_starts=5,
+        random_state=42
+    )
+
+    print('== Group Metrics ==')
+    # From the cached last-fold probabilities of every trial: one grouped confusion matrix per total_lags, nothing is refit or re-predicted
+    trace.step('Group Metrics')
+    group_gap_dict = dict[tuple[int, int, int, float], float]()
+    trial_array_dict = dict[str, np.ndarray]()
+    for total_lags, fold_data_list in fold_data_dict.items():
+        params_list = [params for params in results_dict if params[0] == total_lags]
+        if not params_list:
+            continue
+        y_test_prob_array = np.stack([results_dict[params][3] for params in params_list])
+        group_f_score_array = utility_groups.grouped_f_scores(fold_data_list[-1].y_test, (y_test_prob_array > 0.5).astype(int), fold_data_list[-1].test_code_array)
+        group_gap_dict.update(zip(params_list, utility_groups.max_group_gaps(group_f_score_array)))
+        trial_array_dict.update({
+            f'lags_{total_lags}_params': np.array(params_list, dtype=np.float64),
+            f'lags_{total_lags}_f_scores': np.array([results_dict[params][2] for params in params_list]),
+            f'lags_{total_lags}_probabilities': y_test_prob_array,
+            f'lags_{total_lags}_group_f2_scores': group_f_score_array,
+            f'lags_{total_lags}_zip_codes': test_zip_code_dict[total_lags],
+            f'lags_{total_lags}_y_test': fold_data_list[-1].y_test
+        })
+    eligible_params_list = [params for params in results_dict if options.max_group_gap is None or group_gap_dict[params] <= options.max_group_gap]
+    if not eligible_params_list:
+        print('No trial is within the max group gap, falling back to the fairest one')
+        eligible_params_list = [min(results_dict, key=group_gap_dict.get)]
+    print(f'Eligible trials: {len(eligible_params_list)} of {len(results_dict)}')
+
+    print('== Best Hyperparameters ==')
+    trace.step('Best Hyperparameters')
+    best_f_score_list = [0] * 3
+    best_f_scores_list = list[tuple[float, float, float]]([(None, None, None)] * 3)
+    best_params_list = list[tuple[int, int, int, float]]([(None, None, None, None)] * 3)
+    best_pipeline_list = list[tuple[StandardScaler, XGBClassifier]]([None] * 3)
+    for params in eligible_params_list:
+        scaler, model, test_f_scores, _ = results_dict[params]
+        for k in range(3):
+            if test_f_scores[k] > best_f_score_list[k]:
+                best_f_score_list[k] = test_f_scores[k]
+                best_f_scores_list[k] = test_f_scores
+                best_params_list[k] = params
+                best_pipeline_list[k] = (scaler, model)
+    for k, beta in enumerate(['0_5', '1', '2']):
+        print(f'Regarding F{beta}-Score:')
+        print(f'  Best Hyperparameters -> total_lags: {best_params_list[k][0]}, max_depth: {best_params_list[k][1]}, n_estimators: {best_params_list[k][2]}, learning_rate: {best_params_list[k][3]:.6f}')
+        print(f'  Best F-Scores: F0.5-Score {100 * best_f_scores_list[k][0]:.4f}%, F1-Score: {100 * best_f_scores_list[k][1]:.4f}%, F2-Score: {100 * best_f_scores_list[k][2]:.4f}%')
+        print(f'  Max Group Gap (F2-Score): {100 * group_gap_dict[best_params_list[k]]:.4f}%')
+
+    return SearchResult(
+        last_year=last_year,
+        pipeline_list=best_pipeline_list,
+        params_list=best_params_list,
+        f_scores_list=best_f_scores_list,
+        group_gap_list=[float(group_gap_dict[params]) for params in best_params_list],
+        trial_array_dict=trial_array_dict
+    )
+
+
+def store_pipelines(search_result: SearchResult) -> list[str]:
+    # Pickles every pipeline with its manifest, and every trial to xgboost_trials.npz; returns the pipeline paths
+    np.savez_compressed(os.path.join(utility_scoring.MODEL_ROOT, 'xgboost_trials.npz'), group_keys=np.array(['/'.join(key) for key in utility_groups.GROUP_KEY_LIST]), **search_result.trial_array_dict)
+    pipeline_path_list = list[str]()
+    for k, pipeline_name in enumerate(utility_scoring.PIPELINE_NAME_LIST):
+        best_scaler, best_model = search_result.pipeline_list[k]
+        pipeline_path = utility_scoring.pipeline_path_of(pipeline_name)
+        with open(pipeline_path, 'wb') as pipeline_file:
+            pickle.dump((best_scaler, best_model), pipeline_file)
+        utility_features.write_manifest(pipeline_path, search_result.params_list[k][0], pd.Index(best_scaler.feature_names_in_), max_group_gap=search_result.group_gap_list[k], last_training_year=search_result.last_year - 1)
+        pipeline_path_list.append(pipeline_path)
+    return pipeline_path_list
@@ -0,0 +1,109 @@
+import dataclasses
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse
+import utility_cache
+import utility_region
+
+SPATIAL_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_SPATIAL'
+NEIGHBOR_COLUMNS = pd.Index(['homeless_individuals_count', 'median_gross_rent', 'unemployment_rate'])
+NEIGHBOR_SUFFIX = '_neighbor'
+
+
+@dataclasses.dataclass(frozen=True)
+class NeighborWeights:
+    zip_code_index: pd.Index            # Row and column order of the matrix
+    matrix: scipy.sparse.csr_matrix     # 1 where two ZIP codes share a boundary or a corner (queen contiguity)
+
+
+def spatial_enabled() -> bool:
+    return os.environ.get(SPATIAL_ENVIRONMENT_VARIABLE) == '1'
+
+
+def neighbor_columns_of(data_columns: pd.Index) -> pd.Index:
+    return pd.Index([f'{column}{NEIGHBOR_SUFFIX}' for column in NEIGHBOR_COLUMNS if column in data_columns])
+
+
+def pipeline_spatial_inputs_of(data_columns: pd.Index, feature_names) -> tuple[pd.Index, NeighborWeights|None]:
+    # A stored pipeline searched with HOMELESSNESS_SPATIAL=1 has {column}_neighbor_lag_{k} features, whatever the
+    # setting is now: its lag features are built from the neighbor columns too, with the neighbor weights
+    neighbor_columns = neighbor_columns_of(data_columns)
+    neighbor_prefixes = tuple(f'{column}_lag_' for column in neighbor_columns)
+    if not any(str(feature_name).startswith(neighbor_prefixes) for feature_name in feature_names):
+        return data_columns, None
+    return data_columns.append(neighbor_columns), neighbor_weights()
+
+
+def adjacency_path_of(region: utility_region.Region) -> str:
+    return os.path.join(region.output_root, 'utility', 'adjacency', 'queen_adjacency.npz')
+
+
+def build_adjacency(region: utility_region.Region) -> NeighborWeights:
+    # One spatial-index query for every pair of touching ZIP polygons
+    zip_gdf = region.read_zip_shapes()[['ZCTA5CE10', 'geometry']].dissolve(by='ZCTA5CE10')
+    left_idx, right_idx = zip_gdf.sindex.query(zip_gdf.geometry, predicate='intersects')
+    pair_mask = left_idx != right_idx
+    total_zip_codes = zip_gdf.shape[0]
+    matrix = scipy.sparse.csr_matrix(
+        (np.ones(pair_mask.sum(), dtype=np.float32), (left_idx[pair_mask], right_idx[pair_mask])),
+        shape=(total_zip_codes, total_zip_codes)
+    )
+    return NeighborWeights(pd.Index(zip_gdf.index.astype(int)), matrix)
+
+
+def shape_hash_of(region: utility_region.Region) -> str:
+    # The content of the geometries (.shp) and of the ZIP codes they belong to (.dbf), whatever the files' timestamps
+    shape_root = os.path.splitext(region.zip_shape_file_path)[0]
+    return ':'.join([region.zip_code_column] + [utility_cache.file_hash(f'{shape_root}{extension}') for extension in ['.shp', '.dbf'] if os.path.exists(f'{shape_root}{extension}')])
+
+
+def read_adjacency(region: utility_region.Region) -> NeighborWeights:
+    # Cached next to the region's crosswalk and rebuilt only when the shapes change
+    adjacency_path = adjacency_path_of(region)
+    shape_hash = shape_hash_of(region)
+    if os.path.exists(adjacency_path):
+        with np.load(adjacency_path) as adjacency_npz:
+            if 'shape_hash' in adjacency_npz and str(adjacency_npz['shape_hash']) == shape_hash:
+                matrix = scipy.sparse.csr_matrix((adjacency_npz['data'], adjacency_npz['indices'], adjacency_npz['indptr']), shape=tuple(adjacency_npz['shape']))
+                return NeighborWeights(pd.Index(adjacency_npz['zip_codes']), matrix)
+    neighbor_weights = build_adjacency(region)
+    os.makedirs(os.path.dirname(adjacency_path), exist_ok=True)
+    np.savez_compressed(
+        adjacency_path,
+        zip_codes=neighbor_weights.zip_code_index.values, shape_hash=np.array(shape_hash), shape=np.array(neighbor_weights.matrix.shape),
+        data=neighbor_weights.matrix.data, indices=neighbor_weights.matrix.indices, indptr=neighbor_weights.matrix.indptr
+    )
+    return neighbor_weights
+
+
+def neighbor_weights(region_list: list[utility_region.Region]|None = None) -> NeighborWeights:
+    # Regions are stacked block-diagonally, so no ZIP code borrows neighbors across regions;
+    # a ZIP code listed by several regions keeps the neighbors of the first one, as in read_debiased
+    region_list = region_list if region_list is not None else utility_region.modeling_region_list()
+    neighbor_weights_list = [read_adjacency(region) for region in region_list]
+    zip_code_index = pd.Index(np.concatenate([weights.zip_code_index.values for weights in neighbor_weights_list]))
+    matrix = scipy.sparse.block_diag([weights.matrix for weights in neighbor_weights_list], format='csr')
+    first_mask = ~zip_code_index.duplicated(keep='first')
+    return NeighborWeights(zip_code_index[first_mask], matrix[first_mask][:, first_mask].tocsr())
+
+
+def add_neighbor_columns(debiased_df: pd.DataFrame, neighbor_columns: pd.Index, neighbor_weights: NeighborWeights) -> pd.DataFrame:
+    # {column}_neighbor is the mean of column over the ZIP code's neighbors in the same year, from one
+    # sparse-dense product per year; ZIP codes without a known neighbor keep their own value
+    source_columns = [column[:-len(NEIGHBOR_SUFFIX)] for column in neighbor_columns]
+    source_array = debiased_df[source_columns].to_numpy(dtype=np.float64)
+    neighbor_array = np.full(source_array.shape, np.nan)
+    position_array = neighbor_weights.zip_code_index.get_indexer(debiased_df['zip_code'])
+    for year_idx in debiased_df.groupby('year', sort=False).indices.values():
+        year_idx = year_idx[position_array[year_idx] >= 0]
+        X = np.zeros((neighbor_weights.zip_code_index.size, len(source_columns)))
+        known_X = np.zeros(X.shape)
+        X[position_array[year_idx]] = np.nan_to_num(source_array[year_idx])
+        known_X[position_array[year_idx]] = ~np.isnan(source_array[year_idx])
+        neighbor_total_X = neighbor_weights.matrix @ X
+        neighbor_count_X = neighbor_weights.matrix @ known_X
+        with np.errstate(invalid='ignore', divide='ignore'):
+            neighbor_array[year_idx] = (neighbor_total_X / neighbor_count_X)[position_array[year_idx]]
+    neighbor_array = np.where(np.isnan(neighbor_array), source_array, neighbor_array)
+    return debiased_df.assign(**{column: neighbor_array[:, k] for k, column in enumerate(neighbor_columns)})
@@ -0,0 +1,152 @@
+import atexit
+import cProfile
+import datetime
+import json
+import os
+import resource
+import time
+import tracemalloc
+import uuid
+import utility_region
+
+BASE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG_ROOT = os.path.join(BASE_ROOT, 'data', 'logs')
+
+TRACE_PATH_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_TRACE_PATH'
+TRACEMALLOC_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_TRACEMALLOC'
+PROFILE_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_PROFILE'
+RUN_ID_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_RUN_ID'
+
+
+def peak_rss_mb() -> float:
+    # VmHWM is reset on exec, unlike ru_maxrss which inherits the parent's peak on Linux
+    try:
+        with open('/proc/self/status') as status_file:
+            for line in status_file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def current_rss_mb() -> float|None:
+    try:
+        with open('/proc/self/statm') as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+# Records one JSON line per named step of a stage script: wall and CPU time, memory and row counts.
+# Steps are sequential checkpoints, so a step lasts until the script's next banner. HOMELESSNESS_TRACEMALLOC=1
+# adds per-step Python allocation peaks and HOMELESSNESS_PROFILE=1 dumps a cProfile of the whole stage.
+class StageTrace:
+
+    def __init__(self, stage_file_path: str, region_name: str|None = None):
+        self.stage_name = os.path.basename(stage_file_path)[:-3]
+        self.run_id = os.environ.get(RUN_ID_ENVIRONMENT_VARIABLE) or uuid.uuid4().hex[:12]
+        # The stage's region, or for a modeling run over merged regions all of them, e.g. 'los_angeles,san_diego'
+        self.region = region_name or os.environ.get(utility_region.REGION_ENVIRONMENT_VARIABLE) or os.environ.get(utility_region.REGIONS_ENVIRONMENT_VARIABLE) or None
+        self.trace_path = os.environ.get(TRACE_PATH_ENVIRONMENT_VARIABLE) or os.path.join(LOG_ROOT, 'trace.jsonl')
+        self.trace_memory = os.environ.get(TRACEMALLOC_ENVIRONMENT_VARIABLE) == '1'
+        self.profiler = cProfile.Profile() if os.environ.get(PROFILE_ENVIRONMENT_VARIABLE) == '1' else None
+        self.current_step = None
+        self.stage_start = (time.perf_counter(), time.process_time())
+        self.is_closed = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+        atexit.register(self.close)
+
+    def step(self, step_name: str, rows_in: int|None = None, **context) -> None:
+        self.end_step()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self.current_step = {
+            'step': step_name,
+            'context': context,
+            'rows_in': rows_in,
+            'rows_out': None,
+            'start': (time.perf_counter(), time.process_time())
+        }
+
+    def rows(self, rows_out: int) -> None:
+        if self.current_step is not None:
+            self.current_step['rows_out'] = int(rows_out)
+
+    def end_step(self) -> None:
+        if self.current_step is None:
+            return
+        step, self.current_step = self.current_step, None
+        start_wall, start_cpu = step.pop('start')
+        record = {
+            'wall_seconds': time.perf_counter() - start_wall,
+            'cpu_seconds': time.process_time() - start_cpu,
+            'rss_mb': current_rss_mb(),
+            'peak_rss_mb': peak_rss_mb()
+        }
+        if self.trace_memory:
+            record['peak_traced_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        self.write({**step, **record})
+
+    def close(self) -> None:
+        if self.is_closed:
+            return
+        self.end_step()
+        self.is_closed = True
+        self.write({
+            'step': 'Total',
+            'context': {},
+            'wall_seconds': time.perf_counter() - self.stage_start[0],
+            'cpu_seconds': time.process_time() - self.stage_start[1],
+            'peak_rss_mb': peak_rss_mb()
+        })
+        if self.profiler is not None:
+            self.profiler.disable()
+            profile_path = os.path.join(os.path.dirname(self.trace_path), 'profiles', f'{self.stage_name}_{self.run_id}.prof')
+            os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+            self.profiler.dump_stats(profile_path)
+
+    def write(self, record: dict) -> None:
+        record = {
+            'timestamp': datetime.datetime.now().isoformat(timespec='milliseconds'),
+            'run_id': self.run_id,
+            'region': self.region,
+            'stage': self.stage_name,
+            **record
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.trace_path)), exist_ok=True)
+        # One short append per line keeps concurrent stages from interleaving records
+        with open(self.trace_path, 'a') as trace_file:
+            trace_file.write(json.dumps(record, default=str) + '\n')
+
+
+if __name__ == '__main__':
+    import argparse
+    import collections
+
+    parser = argparse.ArgumentParser(description='Summarize a trace file: time and memory per stage step, slowest first.')
+    parser.add_argument('--trace', default=os.environ.get(TRACE_PATH_ENVIRONMENT_VARIABLE) or os.path.join(LOG_ROOT, 'trace.jsonl'))
+    parser.add_argument('--run-id', help='Run to summarize (default: the latest one)')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.trace) as trace_file:
+        record_list = [json.loads(line) for line in trace_file if line.strip()]
+    run_id = args.run_id or record_list[-1]['run_id']
+    step_dict = collections.defaultdict(lambda: {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'peak_rss_mb': 0.0, 'rows_in': 0})
+    for record in record_list:
+        if record['run_id'] != run_id or record['step'] == 'Total':
+            continue
+        summary = step_dict[(record['region'], record['stage'], record['step'])]
+        summary['calls'] += 1
+        summary['wall_seconds'] += record['wall_seconds']
+        summary['cpu_seconds'] += record['cpu_seconds']
+        summary['peak_rss_mb'] = max(summary['peak_rss_mb'], record['peak_rss_mb'])
+        summary['rows_in'] += record.get('rows_in') or 0
+
+    print(f'== Run {run_id} ==')
+    for (region, stage, step), summary in sorted(step_dict.items(), key=lambda item: -item[1]['wall_seconds'])[:args.top]:
+        print(f'  {(region or "-"):<12} {stage:<28} {step:<32} x{summary["calls"]:<4} wall {summary["wall_seconds"]:9.2f}s  cpu {summary["cpu_seconds"]:9.2f}s  peak RSS {summary["peak_rss_mb"]:8.1f} MB  rows in {summary["rows_in"]}')
@@ -0,0 +1,426 @@
+import os
+import pandas as pd
+import utility_cache
+import utility_raw
+import utility_region
+import utility_schema
+import utility_trace
+
+# The transform stages as functions of a region: each reads the raw extracts of one dataset (parsed by utility_raw,
+# cached by utility_cache) and returns its per-year, per-ZIP table, which store_transformed writes. The
+# transform_0*.py scripts and homelessness.transform both run them.
+
+# ACS estimates combined into each column: averaged for income, summed for the counts and rates of the other datasets
+INCOME_GROUPING_DICT = {
+    'median_income': [
+        'S1903_C02_001E',  # Median income (dollars)!!Estimate!!Households
+    ],
+    'median_income_male': [
+        'S1903_C02_020E',  # Median income (dollars)!!Estimate!!FAMILIES!!Male householder, no wife present
+        'S1903_C02_025E',  # Median income (dollars)!!Estimate!!NONFAMILY HOUSEHOLDS!!Male householder
+        'S1903_C02_026E',  # Median income (dollars)!!Estimate!!NONFAMILY HOUSEHOLDS!!Male householder!!Living alone
+        'S1903_C02_027E',  # Median income (dollars)!!Estimate!!NONFAMILY HOUSEHOLDS!!Male householder!!Not living alone
+    ],
+    'median_income_female': [
+        'S1903_C02_019E',  # Median income (dollars)!!Estimate!!FAMILIES!!Female householder, no husband present
+        'S1903_C02_022E',  # Median income (dollars)!!Estimate!!NONFAMILY HOUSEHOLDS!!Female householder
+        'S1903_C02_023E',  # Median income (dollars)!!Estimate!!NONFAMILY HOUSEHOLDS!!Female householder!!Living alone
+        'S1903_C02_024E',  # Median income (dollars)!!Estimate!!NONFAMILY HOUSEHOLDS!!Female householder!!Not living alone
+    ],
+    'median_income_age_below_24': [
+        'S1903_C02_016E',  # Median income (dollars)!!Estimate!!FAMILIES!!Families!!With own children under 18 years
+        'S1903_C02_011E',  # Median income (dollars)!!Estimate!!HOUSEHOLD INCOME BY AGE OF HOUSEHOLDER!!15 to 24 years
+    ],
+    'median_income_age_between_25_44': [
+        'S1903_C02_012E',  # Median income (dollars)!!Estimate!!HOUSEHOLD INCOME BY AGE OF HOUSEHOLDER!!25 to 44 years
+    ],
+    'median_income_age_above_45': [
+        'S1903_C02_013E',  # Median income (dollars)!!Estimate!!HOUSEHOLD INCOME BY AGE OF HOUSEHOLDER!!45 to 64 years
+        'S1903_C02_014E',  # Median income (dollars)!!Estimate!!HOUSEHOLD INCOME BY AGE OF HOUSEHOLDER!!65 years and over
+    ],
+    'median_income_white': [
+        'S1903_C02_002E',  # Median income (dollars)!!Estimate!!One race!!White
+        'S1903_C02_010E',  # Median income (dollars)!!Estimate!!White alone, not Hispanic or Latino
+    ],
+    'median_income_black': [
+        'S1903_C02_003E',  # Median income (dollars)!!Estimate!!One race!!Black or African American
+    ],
+    'median_income_hispanic': [
+        'S1903_C02_009E',  # Median income (dollars)!!Estimate!!Hispanic or Latino origin (of any race)
+    ],
+    'median_income_other_races': [
+        'S1903_C02_004E',  # Median income (dollars)!!Estimate!!One race!!American Indian and Alaska Native
+        'S1903_C02_005E',  # Median income (dollars)!!Estimate!!One race!!Asian
+        'S1903_C02_006E',  # Median income (dollars)!!Estimate!!One race!!Native Hawaiian and Other Pacific Islander
+        'S1903_C02_007E',  # Median income (dollars)!!Estimate!!One race!!Some other race
+        'S1903_C02_008E',  # Median income (dollars)!!Estimate!!Two or more races
+    ]
+}
+
+POVERTY_GROUPING_DICT = {
+    'below_poverty_level_individuals_count': [
+        'S1701_C02_001E'  # Total population
+    ],
+    'below_poverty_level_individuals_count_male': [
+        'S1701_C02_006E'  # Male
+    ],
+    'below_poverty_level_individuals_count_female': [
+        'S1701_C02_007E'  # Female
+    ],
+    'below_poverty_level_individuals_count_age_below_24': [
+        'S1701_C02_002E'  # Under 18 years
+    ],
+    'below_poverty_level_individuals_count_age_between_25_44': [
+        'S1701_C02_004E'  # 19-64 years (using as proxy with limitation)
+    ],
+    'below_poverty_level_individuals_count_age_above_45': [
+        'S1701_C02_005E'  # 65 years and over
+    ],
+    'below_poverty_level_individuals_count_white': [
+        'S1701_C02_009E'  # White
+    ],
+    'below_poverty_level_individuals_count_black': [
+        'S1701_C02_010E'  # Black or African American
+    ],
+    'below_poverty_level_individuals_count_hispanic': [
+        'S1701_C02_016E'  # Hispanic or Latino origin (of any race)
+    ],
+    'below_poverty_level_individuals_count_other_races': [
+        'S1701_C02_011E',  # American Indian and Alaska Native
+        'S1701_C02_012E',  # Asian
+        'S1701_C02_013E',  # Native Hawaiian and Other Pacific Islander
+        'S1701_C02_014E',  # Some other race
+        'S1701_C02_015E'   # Two or more races
+    ]
+}
+
+EMPLOYMENT_GROUPING_DICT = {
+    'unemployment_rate': ['S2301_C04_001E'],  # Total
+    'unemployment_rate_male': ['S2301_C04_020E'],  # Male
+    'unemployment_rate_female': ['S2301_C04_021E'], # Female
+    'unemployment_rate_age_below_24': [
+        'S2301_C04_002E',  # 16-19
+        'S2301_C04_003E'   # 20-24
+    ],
+    'unemployment_rate_age_between_25_44': [
+        'S2301_C04_004E'   # 25-44
+    ],
+    'unemployment_rate_age_above_45': [
+        'S2301_C04_005E',  # 45-54
+        'S2301_C04_006E',  # 55-64
+        'S2301_C04_007E',  # 65-74
+        'S2301_C04_008E'   # 75+
+    ],
+    'unemployment_rate_white': ['S2301_C04_010E'],  # White
+    'unemployment_rate_black': ['S2301_C04_011E'],  # Black
+    'unemployment_rate_hispanic': ['S2301_C04_017E'],  # Hispanic, Latin, or Mexican
+    'unemployment_rate_other_races': [
+        'S2301_C04_012E', # Native American or Alaskan Native
+        'S2301_C04_013E', # Chinese, Japanese, Korean, Vietnamese, Asian Indian, Filipino, Other Asian
+        'S2301_C04_014E', 'S2301_C02_014E',  # Native Hawaiian
+        'S2301_C04_015E', 'S2301_C02_015E',  # Other race
+        'S2301_C04_016E', 'S2301_C02_016E'   # Two or more races
+    ]
+}
+
+AGE_SEX_GROUPING_DICT = {
+    'population': ['B01001_001E'],  # Total
+    'population_male': ['B01001_002E'],  # Male
+    'population_female': ['B01001_026E'],  # Female
+    'population_age_below_24': [
+        'B01001_003E', 'B01001_004E', 'B01001_005E', 'B01001_006E', 'B01001_007E', 'B01001_008E', 'B01001_009E', 'B01001_010E',  # Male: 0-5, 5-9, 10-14, 15-17, 18-19, 20, 21, 22-24
+        'B01001_027E', 'B01001_028E', 'B01001_029E', 'B01001_030E', 'B01001_031E', 'B01001_032E', 'B01001_033E', 'B01001_034E'  # Female: 0-5, 5-9, 10-14, 15-17, 18-19, 20, 21, 22-24
+    ],
+    'population_age_between_25_44': [
+        'B01001_011E', 'B01001_012E', 'B01001_013E', 'B01001_014E', # Male: 25-29, 30-34, 35-39, 40-44
+        'B01001_035E', 'B01001_036E', 'B01001_037E', 'B01001_038E' # Female: 25-29, 30-34, 35-39, 40-44
+    ],
+    'population_age_above_45': [
+        'B01001_015E', 'B01001_016E', 'B01001_017E', 'B01001_018E', 'B01001_019E', 'B01001_020E', 'B01001_021E', 'B01001_022E', 'B01001_023E', 'B01001_024E', 'B01001_025E', # Male: 45-49, 50-54, 55-59, 60-61, 62-64, 65-66, 67-69, 70-74, 75-79, 80-84, 85+
+        'B01001_039E', 'B01001_040E', 'B01001_041E', 'B01001_042E', 'B01001_043E', 'B01001_044E', 'B01001_045E', 'B01001_046E', 'B01001_047E', 'B01001_048E', 'B01001_049E' # Female: 45-49, 50-54, 55-59, 60-61, 62-64, 65-66, 67-69, 70-74, 75-79, 80-84, 85+
+    ]
+}
+
+ETHNICITY_GROUPING_DICT = {
+    'population_white': [
+        'B03002_003E',  # Non-Hispanic White alone
+        'B03002_013E'   # Hispanic White alone
+    ],
+    'population_black': [
+        'B03002_004E',  # Non-Hispanic Black or African American alone
+        'B03002_014E'   # Hispanic Black or African American alone
+    ],
+    'population_hispanic': [
+        'B03002_012E'   # Total Hispanic or Latino population (any race)
+    ],
+    'population_other_races': [
+        'B03002_005E',  # Non-Hispanic American Indian and Alaska Native alone
+        'B03002_015E',  # Hispanic American Indian and Alaska Native alone
+        'B03002_006E',  # Non-Hispanic Asian alone
+        'B03002_016E',  # Hispanic Asian alone
+        'B03002_007E',  # Non-Hispanic Native Hawaiian and Other Pacific Islander alone
+        'B03002_017E',  # Hispanic Native Hawaiian and Other Pacific Islander alone
+        'B03002_008E',  # Non-Hispanic Some Other Race alone
+        'B03002_018E',  # Hispanic Some Other Race alone
+        'B03002_009E',  # Non-Hispanic Two or More Races
+        'B03002_019E'   # Hispanic Two or More Races
+    ]
+}
+
+# Victim descent codes of the crime incidents
+VICTIM_DESCENT_GROUPING_DICT = {
+    'W': 'victims_count_white',  # White
+    'B': 'victims_count_black',  # Black
+    'H': 'victims_count_hispanic',  # Hispanic, Latin, or Mexican
+    'C': 'victims_count_other_races',  # Chinese
+    'J': 'victims_count_other_races',  # Japanese
+    'K': 'victims_count_other_races',  # Korean
+    'V': 'victims_count_other_races',  # Vietnamese
+    'Z': 'victims_count_other_races',  # Asian Indian
+    'F': 'victims_count_other_races',  # Filipino (grouped as Asian here)
+    'A': 'victims_count_other_races',  # Other Asian (assumed East Asian)
+    'I': 'victims_count_other_races',  # American Indian/Alaskan Native
+    'D': 'victims_count_other_races',  # Cambodian (Southeast Asian)
+    'G': 'victims_count_other_races',  # Guamanian (Pacific Islander)
+    'L': 'victims_count_other_races',  # Laotian (Southeast Asian)
+    'P': 'victims_count_other_races',  # Pacific Islander
+    'S': 'victims_count_other_races',  # Samoan (Pacific Islander)
+    'U': 'victims_count_other_races',  # Hawaiian (Pacific Islander)
+    'O': 'victims_count_other_races',  # Other
+    'X': 'victims_count_other_races',  # Unknown
+    '-': 'victims_count_other_races',  # Unknown
+    '': 'victims_count_other_races'   # Unknown
+}
+
+
+def read_acs_files(region: utility_region.Region, dataset_name: str, trace: utility_trace.StageTrace) -> pd.DataFrame:
+    # Every year's table of an ACS dataset restricted to the region's ZIP codes, the year taken from the file name
+    trace.step('Shape File')
+    zip_code_sr = region.read_zip_codes()
+    raw_data_folder_path = region.raw_data_folder_path(dataset_name)
+    raw_file_name_list = sorted(raw_file_name for raw_file_name in os.listdir(raw_data_folder_path) if raw_file_name.endswith('Data.csv'))
+
+    raw_df_list = list[pd.DataFrame]()
+    for raw_file_name in raw_file_name_list:
+
+        print(f'== {raw_file_name} ==')
+
+        print('  Loading and Local Filtering ...')
+        trace.step('Loading and Local Filtering', file=raw_file_name)
+        raw_path = os.path.join(raw_data_folder_path, raw_file_name)
+        raw_df, is_cached = utility_cache.cached_frame(dataset_name, raw_path, utility_raw.load_acs_file, zip_code_sr)
+        trace.rows(raw_df.shape[0])
+        if is_cached:
+            print('    From cache')
+
+        print('  Minor Processing ...')
+        trace.step('Minor Processing', file=raw_file_name)
+        raw_df = raw_df.assign(year=raw_file_name[7:11])
+        raw_df_list.append(raw_df)
+
+    print('== Transformation ==')
+    trace.step('Transformation', rows_in=sum(raw_df.shape[0] for raw_df in raw_df_list))
+    return pd.concat(raw_df_list, ignore_index=True)
+
+
+def grouped_acs_frame(raw_df: pd.DataFrame, grouping_dict: dict[str, list[str]], average: bool = False) -> pd.DataFrame:
+    transformed_df = pd.DataFrame({
+        'year': raw_df['year'],
+        'zip_code': raw_df['zip_code']
+    })
+    for group_name, column_name_list in grouping_dict.items():
+        if average:
+            transformed_df[group_name] = raw_df[column_name_list].mean(axis=1, skipna=True)
+        else:
+            transformed_df[group_name] = raw_df[column_name_list].sum(axis=1, min_count=1)
+    return transformed_df.sort_values(['year', 'zip_code'])
+
+
+def transform_homeless_count(region: utility_region.Region, trace: utility_trace.StageTrace) -> pd.DataFrame:
+    # Tract counts summed per ZIP code through the crosswalk quarter covering most of the year's tracts
+    trace.step('Crosswalk Loading')
+    cross_path = os.path.join(region.crosswalk_folder_path, 'crosswalk.csv')
+    cross_df = utility_schema.read_csv(cross_path, utility_schema.CROSSWALK_DTYPE_DICT)
+    trace.rows(cross_df.shape[0])
+
+    raw_file_name_list = sorted(raw_file_name for raw_file_name in os.listdir(region.homeless_count_folder_path) if raw_file_name.endswith('.csv'))
+
+    agg_df_list = list[pd.DataFrame]()
+    for raw_file_name in raw_file_name_list:
+
+        print(f'== {raw_file_name} ==')
+
+        print('  Loading ...')
+        trace.step('Loading', file=raw_file_name)
+        raw_path = os.path.join(region.homeless_count_folder_path, raw_file_name)
+        raw_df, is_cached = utility_cache.cached_frame('01_homeless_count', raw_path, utility_raw.load_homeless_count_file, region.county_fips)
+        trace.rows(raw_df.shape[0])
+        if is_cached:
+            print('    From cache')
+
+        print('  Crosswalk ...')
+        trace.step('Crosswalk', rows_in=raw_df.shape[0], file=raw_file_name)
+        quarter_list = cross_df['quarter'].unique().tolist()
+        max_tracts_covered = 0
+        max_quarter = None
+        max_cross_df = None
+        for quarter in quarter_list:
+            temp_cross_df:pd.DataFrame = cross_df[cross_df['quarter'] == quarter]
+            total_tracts_covered = raw_df['tract'].isin(temp_cross_df['tract']).sum()
+            if total_tracts_covered > max_tracts_covered:
+                max_tracts_covered = total_tracts_covered
+                max_quarter = quarter
+                max_cross_df = temp_cross_df
+        print('    Maximal Quarter:', max_quarter)
+        trace.rows(max_tracts_covered)
+
+        print('  Transformation ...')
+        trace.step('Transformation', rows_in=raw_df.shape[0], file=raw_file_name)
+        zip_code_list = max_cross_df['zip_code'].unique().tolist()
+        agg_row_list = list[dict[str, str|pd.Series]]()
+        for zip_code in zip_code_list:
+            tract_ts = max_cross_df[max_cross_df['zip_code'] == zip_code]['tract']
+            row = {
+                'year': raw_file_name[:4],
+                'zip_code': zip_code,
+                'cars_count': pd.to_numeric(raw_df[raw_df['tract'].isin(tract_ts)]['total cars'], errors='coerce').sum(min_count=1),
+                'vans_count': pd.to_numeric(raw_df[raw_df['tract'].isin(tract_ts)]['total vans'], errors='coerce').sum(min_count=1),
+                'campers_or_rvs_count': pd.to_numeric(raw_df[raw_df['tract'].isin(tract_ts)]['total campers or rvs'], errors='coerce').sum(min_count=1),
+                'tents_count': pd.to_numeric(raw_df[raw_df['tract'].isin(tract_ts)]['total tents'], errors='coerce').sum(min_count=1),
+                'homeless_individuals_count': pd.to_numeric(raw_df[raw_df['tract'].isin(tract_ts)]['total homeless individuals'], errors='coerce').sum(min_count=1)
+            }
+            agg_row_list.append(row)
+        agg_df = pd.DataFrame(agg_row_list)
+        trace.rows(agg_df.shape[0])
+
+        print('  Minor Processing ...')
+        trace.step('Minor Processing', file=raw_file_name)
+        agg_df_list.append(agg_df)
+
+    return pd.concat(agg_df_list, ignore_index=True)
+
+
+def transform_income(region: utility_region.Region, trace: utility_trace.StageTrace) -> pd.DataFrame:
+    transformed_df = grouped_acs_frame(read_acs_files(region, '02_income', trace), INCOME_GROUPING_DICT, average=True)
+    trace.rows(transformed_df.shape[0])
+    return transformed_df
+
+
+def transform_poverty(region: utility_region.Region, trace: utility_trace.StageTrace) -> pd.DataFrame:
+    transformed_df = grouped_acs_frame(read_acs_files(region, '03_poverty', trace), POVERTY_GROUPING_DICT)
+    trace.rows(transformed_df.shape[0])
+    return transformed_df
+
+
+def transform_employment(region: utility_region.Region, trace: utility_trace.StageTrace) -> pd.DataFrame:
+    transformed_df = grouped_acs_frame(read_acs_files(region, '04_employment', trace), EMPLOYMENT_GROUPING_DICT)
+    trace.rows(transformed_df.shape[0])
+    return transformed_df
+
+
+def transform_rent(region: utility_region.Region, trace: utility_trace.StageTrace) -> pd.DataFrame:
+    raw_df = read_acs_files(region, '05_rent', trace)
+    transformed_df = pd.DataFrame({
+        'year': raw_df['year'],
+        'zip_code': raw_df['zip_code'],
+        'median_gross_rent': raw_df['B25064_001E']
+    }).sort_values(['year', 'zip_code'])
+    trace.rows(transformed_df.shape[0])
+    return transformed_df
+
+
+def transform_tenure(region: utility_region.Region, trace: utility_trace.StageTrace) -> pd.DataFrame:
+    raw_df = read_acs_files(region, '06_tenure', trace)
+    transformed_df = pd.DataFrame({
+        'year': raw_df['year'],
+        'zip_code': raw_df['zip_code'],
+        'housing_units_count': raw_df['B25003_001E'],
+        'owner_occupied_housing_units_count': raw_df['B25003_002E'],
+        'renter_occupied_housing_units_count': raw_df['B25003_003E']
+    }).sort_values(['year', 'zip_code'])
+    trace.rows(transformed_df.shape[0])
+    return transformed_df
+
+
+def transform_age_sex(region: utility_region.Region, trace: utility_trace.StageTrace) -> pd.DataFrame:
+    transformed_df = grouped_acs_frame(read_acs_files(region, '07_age_sex', trace), AGE_SEX_GROUPING_DICT)
+    trace.rows(transformed_df.shape[0])
+    return transformed_df
+
+
+def transform_ethnicity(region: utility_region.Region, trace: utility_trace.StageTrace) -> pd.DataFrame:
+    transformed_df = grouped_acs_frame(read_acs_files(region, '08_ethnicity', trace), ETHNICITY_GROUPING_DICT)
+    trace.rows(transformed_df.shape[0])
+    return transformed_df
+
+
+def transform_crime(region: utility_region.Region, trace: utility_trace.StageTrace) -> pd.DataFrame:
+    # Incidents placed in ZIP codes by their coordinates, then counted per year with their victims' breakdowns
+    trace.step('Shape File')
+    zip_gdf = region.read_zip_shapes()
+    zip_gdf = zip_gdf.to_crs(epsg=4326)
+
+    raw_data_folder_path = region.local_raw_data_folder_path('09_crime')
+    raw_file_name_list = sorted(raw_file_name for raw_file_name in os.listdir(raw_data_folder_path) if raw_file_name.endswith('.csv'))
+
+    raw_df_list = list[pd.DataFrame]()
+    for raw_file_name in raw_file_name_list:
+
+        print(f'== {raw_file_name} ==')
+
+        print('  Loading, Local Filtering and Geo-Processing ...')
+        trace.step('Loading, Local Filtering and Geo-Processing', file=raw_file_name)
+        raw_path = os.path.join(raw_data_folder_path, raw_file_name)
+        raw_df, is_cached = utility_cache.cached_frame('09_crime', raw_path, utility_raw.load_crime_file, zip_gdf[['ZCTA5CE10', 'geometry']])
+        trace.rows(raw_df.shape[0])
+        if is_cached:
+            print('    From cache')
+
+        print('  Minor Processing ...')
+        trace.step('Minor Processing', file=raw_file_name)
+        raw_df['Date Rptd'] = pd.to_datetime(raw_df['Date Rptd'], format='%m/%d/%Y %I:%M:%S %p', errors='coerce')
+        raw_df['year'] = raw_df['Date Rptd'].dt.year
+        raw_df = raw_df.rename(columns={'ZCTA5CE10': 'zip_code'})
+        raw_df_list.append(raw_df)
+
+    print('== Transformation ==')
+    trace.step('Transformation', rows_in=sum(raw_df.shape[0] for raw_df in raw_df_list))
+    raw_df = pd.concat(raw_df_list, ignore_index=True)
+    transformed_df = raw_df.groupby(['year', 'zip_code']).agg(
+        crimes_count=pd.NamedAgg(column='DR_NO', aggfunc='count'),
+        victims_count=pd.NamedAgg(column='Vict Age', aggfunc=lambda x: sum(x > 0)),
+        victims_count_male=pd.NamedAgg(column='Vict Sex', aggfunc=lambda x: sum(x == 'M')),
+        victims_count_female=pd.NamedAgg(column='Vict Sex', aggfunc=lambda x: sum(x == 'F')),
+        victims_count_age_below_24=pd.NamedAgg(column='Vict Age', aggfunc=lambda x: sum(x <= 24)),
+        victims_count_age_between_25_44=pd.NamedAgg(column='Vict Age', aggfunc=lambda x: sum((25 <= x) & (x <= 44))),
+        victims_count_age_above_45=pd.NamedAgg(column='Vict Age', aggfunc=lambda x: sum(45 <= x))
+    ).reset_index()
+    transformed_ethnicity_df = raw_df.groupby(['year', 'zip_code'])['Vict Descent'].value_counts().unstack()
+    transformed_ethnicity_df = transformed_ethnicity_df.rename(columns=VICTIM_DESCENT_GROUPING_DICT)
+    transformed_ethnicity_df = transformed_ethnicity_df.T.groupby(level=0).sum().T.reset_index()
+    transformed_ethnicity_df = transformed_ethnicity_df[['year', 'zip_code'] + list(dict.fromkeys(VICTIM_DESCENT_GROUPING_DICT.values()))]
+    transformed_df = transformed_df.merge(transformed_ethnicity_df, on=['year', 'zip_code'], how='left')
+    trace.rows(transformed_df.shape[0])
+    return transformed_df
+
+
+# By the name of the stage's output, e.g. transform_02_income.py writes 02_income.csv
+TRANSFORM_FUNCTION_DICT = {
+    '01_homeless_count': transform_homeless_count,
+    '02_income': transform_income,
+    '03_poverty': transform_poverty,
+    '04_employment': transform_employment,
+    '05_rent': transform_rent,
+    '06_tenure': transform_tenure,
+    '07_age_sex': transform_age_sex,
+    '08_ethnicity': transform_ethnicity,
+    '09_crime': transform_crime
+}
+
+
+def store_transformed(region: utility_region.Region, dataset_name: str, transformed_df: pd.DataFrame) -> str:
+    # Returns the path of the transformed CSV
+    transformed_path = os.path.join(region.transformed_folder_path, f'{dataset_name}.csv')
+    os.makedirs(region.transformed_folder_path, exist_ok=True)
+    utility_schema.to_csv(transformed_df, transformed_path)
+    return transformed_path
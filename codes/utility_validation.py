@@ -0,0 +1,149 @@
+from sklearn.preprocessing import StandardScaler
+import atexit
+import concurrent.futures
+import dataclasses
+import multiprocessing
+import os
+import time
+import numpy as np
+import pandas as pd
+import utility_groups
+import utility_xgboost
+
+F_BETA_LIST = [0.5, 1, 2]
+
+VALIDATION_MODE_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_VALIDATION'
+TOTAL_FOLDS_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_FOLDS'
+FOLD_WORKERS_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_FOLD_WORKERS'
+
+_fold_data_dict = dict[tuple, 'FoldData']()     # Every prepared fold by key, which the fold workers inherit when they fork
+_dtrain_dict = dict[tuple, object]()
+_worker_list = list[tuple[concurrent.futures.ProcessPoolExecutor, frozenset]]()    # Single-process fold workers and the fold keys they inherited
+
+
+def validation_mode() -> str:
+    mode = os.environ.get(VALIDATION_MODE_ENVIRONMENT_VARIABLE, 'holdout')
+    if mode not in ['holdout', 'rolling_origin']:
+        raise ValueError(f'Unknown validation mode {mode!r}, expected "holdout" or "rolling_origin"')
+    return mode
+
+
+def fold_list_of(dev_df: pd.DataFrame, last_year: int, mode: str, total_folds: int = 3) -> list[tuple[np.ndarray, np.ndarray, int]]:
+    # Holdout: train on years before last_year and test on last_year.
+    # Rolling origin: train on years <= t and test on t + 1, for the last total_folds values of t.
+    test_year_list = [last_year] if mode == 'holdout' else list(range(last_year - total_folds + 1, last_year + 1))
+    year_values = dev_df['year'].values
+    fold_list = list[tuple[np.ndarray, np.ndarray, int]]()
+    for test_year in test_year_list:
+        train_idx = np.flatnonzero(year_values < test_year)
+        test_idx = np.flatnonzero(year_values == test_year)
+        if train_idx.size > 0 and test_idx.size > 0:
+            fold_list.append((train_idx, test_idx, test_year))
+    return fold_list
+
+
+@dataclasses.dataclass
+class FoldData:
+    key: tuple              # Identifies the fold's quantized training matrix in every process
+    test_year: int
+    scaler: StandardScaler
+    X_train: np.ndarray     # Standardized float32 features
+    y_train: np.ndarray
+    X_test: np.ndarray
+    y_test: np.ndarray
+    test_code_array: np.ndarray|None = None     # Bias groups of the test rows (see utility_groups.group_code_array_of), when known
+
+
+def prepare_folds(dev_df: pd.DataFrame, feature_columns: pd.Index, target_column: str, fold_list: list[tuple[np.ndarray, np.ndarray, int]], key: tuple) -> list[FoldData]:
+    # Standardizing Features, once per fold: the scaler only depends on the rows, not on the trial. The folds are
+    # registered by key, so the fold workers forked afterwards get them without any per-trial copy
+    fold_data_list = list[FoldData]()
+    has_groups = all(f'{group_name}_majority' in dev_df.columns for group_name in utility_groups.BIAS_TERM_DICT)
+    for train_idx, test_idx, test_year in fold_list:
+        scaler = StandardScaler()
+        X_train = scaler.fit_transform(dev_df[feature_columns].iloc[train_idx])
+        X_test = scaler.transform(dev_df[feature_columns].iloc[test_idx])
+        fold_data_list.append(FoldData(
+            key=(*key, test_year), test_year=test_year, scaler=scaler,
+            X_train=utility_xgboost.to_float32(X_train), y_train=dev_df[target_column].values[train_idx],
+            X_test=utility_xgboost.to_float32(X_test), y_test=dev_df[target_column].values[test_idx],
+            test_code_array=utility_groups.group_code_array_of(dev_df.iloc[test_idx]) if has_groups else None
+        ))
+    _fold_data_dict.update((fold_data.key, fold_data) for fold_data in fold_data_list)
+    return fold_data_list
+
+
+def fit_fold(key: tuple, model_params: dict, n_jobs: int) -> tuple:
+    from sklearn.metrics import fbeta_score
+
+    # The fold is looked up by key, in this process or in the fold worker that inherited it
+    fold_data = _fold_data_dict[key]
+    X_train, y_train, X_test, y_test = fold_data.X_train, fold_data.y_train, fold_data.X_test, fold_data.y_test
+
+    # Quantizing once per fold and process, then reusing the matrix in every later trial
+    if key not in _dtrain_dict:
+        _dtrain_dict[key] = utility_xgboost.quantile_dmatrix(X_train, y_train, n_jobs)
+
+    # Train model (timed here, in whichever process runs the fold)
+    start = time.perf_counter()
+    model = utility_xgboost.train_classifier(_dtrain_dict[key], model_params, n_jobs)
+    fit_seconds = time.perf_counter() - start
+
+    # Predict and score; the float32 test probabilities are returned too, so trials can be compared later without predicting again
+    y_train_pred = model.predict(X_train)
+    y_test_prob = model.predict_proba(X_test)[:, 1].astype(np.float32)
+    y_test_pred = (y_test_prob > 0.5).astype(int)  # What predict() does with the same probabilities
+    train_f_scores = tuple(fbeta_score(y_train, y_train_pred, beta=beta, average='binary') for beta in F_BETA_LIST)
+    test_f_scores = tuple(fbeta_score(y_test, y_test_pred, beta=beta, average='binary') for beta in F_BETA_LIST)
+    return model, train_f_scores, test_f_scores, y_test_prob, fit_seconds
+
+
+def get_workers(workers: int, fold_key_list: list[tuple]) -> list[concurrent.futures.ProcessPoolExecutor]|None:
+    # One single-process worker per fold slot, fold i always running on worker i % workers, so every worker keeps the
+    # quantized matrices of its own folds. Fork keeps the stage scripts, which run at import time, from being re-executed
+    # in the workers and hands them the registered folds; a worker is forked again only when it is given a fold registered after it
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return None
+    if len(_worker_list) != workers:
+        shutdown_executors()
+    for k in range(workers):
+        if k == len(_worker_list) or not _worker_list[k][1].issuperset(fold_key_list[k::workers]):
+            if k < len(_worker_list):
+                _worker_list[k][0].shutdown(wait=True)
+            worker = (concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('fork')), frozenset(_fold_data_dict))
+            if k == len(_worker_list):
+                _worker_list.append(worker)
+            else:
+                _worker_list[k] = worker
+    return [executor for executor, _ in _worker_list]
+
+
+def fit_folds(fold_data_list: list[FoldData], model_params: dict, workers: int = 1) -> list[tuple]:
+    # Returns (scaler, model, train F-scores, test F-scores, test probabilities, fit seconds) per fold; the folds must
+    # come from prepare_folds, and only their keys are sent to the workers
+    workers = min(workers, len(fold_data_list))
+    executor_list = get_workers(workers, [fold_data.key for fold_data in fold_data_list])
+    # Split the thread budget between the folds running side by side instead of oversubscribing the cores
+    n_jobs = max(1, utility_xgboost.thread_budget() // (workers if executor_list is not None else 1))
+    if executor_list is None:
+        fold_result_list = [fit_fold(fold_data.key, model_params, n_jobs) for fold_data in fold_data_list]
+    else:
+        future_list = [executor_list[k % workers].submit(fit_fold, fold_data.key, model_params, n_jobs) for k, fold_data in enumerate(fold_data_list)]
+        fold_result_list = [future.result() for future in future_list]
+    return [(fold_data.scaler, *fold_result) for fold_data, fold_result in zip(fold_data_list, fold_result_list)]
+
+
+def reset_fold_cache() -> None:
+    # The folds and quantized matrices are keyed by (total_lags, test_year) only, so a search must not see the ones of
+    # an earlier search run in the same process on other data; the workers hold copies of them too and are replaced
+    shutdown_executors()
+    _fold_data_dict.clear()
+    _dtrain_dict.clear()
+
+
+@atexit.register
+def shutdown_executors() -> None:
+    # Waits for the fold workers to exit, so their CPU time is accounted to this process's children
+    for executor, _ in _worker_list:
+        executor.shutdown(wait=True)
+    _worker_list.clear()
@@ -0,0 +1,128 @@
+from xgboost import XGBClassifier
+from sklearn.metrics import fbeta_score
+from sklearn.preprocessing import StandardScaler
+import dataclasses
+import os
+import pickle
+import time
+import numpy as np
+import pandas as pd
+import utility_features
+import utility_groups
+import utility_scoring
+import utility_spatial
+import utility_trace
+import utility_validation
+import utility_xgboost
+
+
+@dataclasses.dataclass(frozen=True)
+class WarmStartOptions:
+    rounds: int = 20                    # Boosting rounds added on the new years' rows
+    tolerance: float = 0.01             # F-score the warm start may lose against a full retrain and still be stored
+    trained_through: int|None = None    # Last training year of pipelines stored without one in their manifest
+
+
+def environment_warm_start_options() -> WarmStartOptions:
+    # The last training year of pipelines stored without one must be stated rather than guessed: a wrong year would
+    # make the warm start boost again on years the booster has seen, or skip years it has not
+    trained_through = os.environ.get('HOMELESSNESS_WARM_START_TRAINED_THROUGH')
+    return WarmStartOptions(
+        rounds=int(os.environ.get('HOMELESSNESS_WARM_START_ROUNDS', 20)),
+        tolerance=float(os.environ.get('HOMELESSNESS_WARM_START_TOLERANCE', 0.01)),
+        trained_through=None if trained_through is None else int(trained_through)
+    )
+
+
+def refresh_pipelines(debiased_df: pd.DataFrame, options: WarmStartOptions, trace: utility_trace.StageTrace) -> list[str]:
+    # Yearly refresh of the stored pipelines without a new Bayesian search: each pipeline keeps boosting
+    # on the rows of the years that joined the training set since its manifest's last_training_year, and is
+    # compared with a full retrain that uses the same hyperparameters. The warm-start model is stored only when
+    # its F-score is within tolerance. The stored scaler is kept: the trees' split points are in its units.
+    # Returns the paths of the pipelines rewritten
+    print('== Setup ==')
+    trace.step('Setup')
+    last_year = int(debiased_df['year'].max())
+    identity_columns, majority_columns, data_columns = utility_features.split_columns(debiased_df)
+    threads = utility_xgboost.thread_budget()
+    print(f'Last training year: {last_year - 1}, test year: {last_year}')
+    print(f'Warm start: {options.rounds} rounds, tolerance {100 * options.tolerance:.2f}%')
+    absorbed_year_list = list[int]()
+    for pipeline_name in utility_scoring.PIPELINE_NAME_LIST:
+        beta = pipeline_name[1:]
+        pipeline_path = utility_scoring.pipeline_path_of(pipeline_name)
+        manifest_dict = utility_features.read_manifest(pipeline_path)
+        if 'last_training_year' in manifest_dict:
+            absorbed_year_list.append(int(manifest_dict['last_training_year']))
+        elif options.trained_through is not None:
+            absorbed_year_list.append(options.trained_through)
+            print(f'F{beta}-Score pipeline: no last_training_year in its manifest, assuming {options.trained_through} (HOMELESSNESS_WARM_START_TRAINED_THROUGH)')
+        else:
+            raise ValueError(f'{utility_features.manifest_path_of(pipeline_path)} does not record the last_training_year of the pipeline; '
+                             'retrain it with model_xgboost.py, or set HOMELESSNESS_WARM_START_TRAINED_THROUGH to the last year it was trained on')
+
+    refreshed_path_list = list[str]()
+    dev_df_dict = dict[tuple[int, bool], pd.DataFrame]()
+    for k, pipeline_name in enumerate(utility_scoring.PIPELINE_NAME_LIST):
+        beta = pipeline_name[1:]
+        f_beta = utility_validation.F_BETA_LIST[k]
+        pipeline_path = utility_scoring.pipeline_path_of(pipeline_name)
+
+        print(f'== F{beta}-Score Pipeline ==')
+        trace.step(f'F{beta}-Score Pipeline', rows_in=debiased_df.shape[0])
+        with open(pipeline_path, 'rb') as pipeline_file:
+            scaler, model = tuple[StandardScaler, XGBClassifier](pickle.load(pipeline_file))
+        pipeline_data_columns, neighbor_weights = utility_spatial.pipeline_spatial_inputs_of(data_columns, scaler.feature_names_in_)
+        total_lags, feature_columns = utility_features.pipeline_features_of(pipeline_path, scaler.feature_names_in_, pipeline_data_columns)
+        model_params = {key: model.get_params()[key] for key in ['max_depth', 'n_estimators', 'learning_rate']}
+        print(f'  Stored Hyperparameters -> total_lags: {total_lags}, max_depth: {model_params["max_depth"]}, n_estimators: {model_params["n_estimators"]}, learning_rate: {model_params["learning_rate"]:.6f}')
+
+        absorbed_year = absorbed_year_list[k]
+        if absorbed_year >= last_year - 1:
+            print(f'  Up to date: trained through {absorbed_year}')
+            continue
+
+        # Preparing the dataset
+        dev_key = (total_lags, neighbor_weights is not None)
+        if dev_key not in dev_df_dict:
+            dev_df_dict[dev_key] = utility_features.build_lag_features(debiased_df, pipeline_data_columns, total_lags, majority_columns, neighbor_weights=neighbor_weights)
+        dev_df = dev_df_dict[dev_key]
+        train_df = dev_df[dev_df['year'] < last_year]
+        new_df = dev_df[(dev_df['year'] > absorbed_year) & (dev_df['year'] < last_year)]
+        test_df = dev_df[dev_df['year'] == last_year]
+        y_test = test_df[utility_features.TARGET_COLUMN].values
+        trace.rows(train_df.shape[0] + test_df.shape[0])
+
+        # Full retrain with the stored hyperparameters
+        start = time.perf_counter()
+        full_scaler = StandardScaler()
+        X_train = utility_xgboost.to_float32(full_scaler.fit_transform(train_df[feature_columns]))
+        full_model = utility_xgboost.train_classifier(utility_xgboost.quantile_dmatrix(X_train, train_df[utility_features.TARGET_COLUMN].values, threads), model_params, threads)
+        y_full_test_pred = full_model.predict(utility_xgboost.to_float32(full_scaler.transform(test_df[feature_columns])))
+        full_f_score = fbeta_score(y_test, y_full_test_pred, beta=f_beta, average='binary')
+        print(f'  Full Retrain -> F{beta}-Score: {100 * full_f_score:.4f}% ({time.perf_counter() - start:.1f}s)')
+
+        # Warm start: the stored booster keeps boosting on the new years' rows only
+        start = time.perf_counter()
+        X_new = utility_xgboost.to_float32(scaler.transform(new_df[feature_columns]))
+        warm_model = utility_xgboost.train_classifier(
+            utility_xgboost.quantile_dmatrix(X_new, new_df[utility_features.TARGET_COLUMN].values, threads),
+            {**model_params, 'n_estimators': options.rounds}, threads, xgb_model=model.get_booster()
+        )
+        y_warm_test_pred = warm_model.predict(utility_xgboost.to_float32(scaler.transform(test_df[feature_columns])))
+        warm_f_score = fbeta_score(y_test, y_warm_test_pred, beta=f_beta, average='binary')
+        print(f'  Warm Start   -> F{beta}-Score: {100 * warm_f_score:.4f}% ({time.perf_counter() - start:.1f}s)')
+
+        # Promotion
+        if warm_f_score >= full_f_score - options.tolerance:
+            print('  Promoted: warm start')
+            best_pipeline, y_best_test_pred = (scaler, warm_model), y_warm_test_pred
+        else:
+            print('  Promoted: full retrain')
+            best_pipeline, y_best_test_pred = (full_scaler, full_model), y_full_test_pred
+        with open(pipeline_path, 'wb') as pipeline_file:
+            pickle.dump(best_pipeline, pipeline_file)
+        refreshed_path_list.append(pipeline_path)
+        best_group_gap = float(utility_groups.max_group_gaps(utility_groups.grouped_f_scores(y_test, y_best_test_pred[np.newaxis], utility_groups.group_code_array_of(test_df)))[0])
+        utility_features.update_manifest(pipeline_path, total_lags, feature_columns, max_group_gap=best_group_gap, last_training_year=last_year - 1)
+    return refreshed_path_list
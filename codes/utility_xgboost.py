@@ -0,0 +1,32 @@
+import os
+import numpy as np
+import xgboost
+from xgboost import XGBClassifier
+
+THREADS_ENVIRONMENT_VARIABLE = 'HOMELESSNESS_THREADS'
+
+
+def thread_budget() -> int:
+    # Threads one job may use; set it when several jobs share a node
+    return max(1, int(os.environ.get(THREADS_ENVIRONMENT_VARIABLE) or os.cpu_count() or 1))
+
+
+def to_float32(X) -> np.ndarray:
+    # XGBoost stores feature values as float32, so this only saves the copy it would make itself
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+
+def quantile_dmatrix(X: np.ndarray, y: np.ndarray, n_jobs: int) -> xgboost.QuantileDMatrix:
+    return xgboost.QuantileDMatrix(to_float32(X), label=y, nthread=n_jobs)
+
+
+def train_classifier(dtrain: xgboost.DMatrix, model_params: dict, n_jobs: int, xgb_model: xgboost.Booster|None = None) -> XGBClassifier:
+    # Trains on an already quantized matrix with the exact parameters XGBClassifier.fit would use,
+    # and hands back a regular XGBClassifier so stored pipelines keep the same shape.
+    # With xgb_model, n_estimators more rounds are boosted on top of that booster's trees
+    model = XGBClassifier(eval_metric='logloss', tree_method='hist', n_jobs=n_jobs, **model_params)
+    booster = xgboost.train(model.get_xgb_params(), dtrain, num_boost_round=model.get_num_boosting_rounds(), xgb_model=xgb_model)
+    model.load_model(booster.save_raw())
+    if xgb_model is not None:
+        model.set_params(n_estimators=booster.num_boosted_rounds())
+    return model
@@ -0,0 +1,49 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'codes'))
+
+import utility_query
+import utility_region
+
+pytest.importorskip('duckdb')
+
+
+def region_of(output_root: str, name: str, homeless_count: float) -> utility_region.Region:
+    # A region whose only stage output is a two-row prepared 04_debiased.csv
+    region = utility_region.Region(name=name, zip_shape_file_path='', county_fips='', raw_data_root='', local_raw_data_root='', output_root=output_root)
+    os.makedirs(region.prepared_folder_path)
+    pd.DataFrame({
+        'year': [2020, 2021],
+        'zip_code': [90001, 90001],
+        'homeless_individuals_count': [homeless_count, homeless_count + 1]
+    }).to_csv(os.path.join(region.prepared_folder_path, '04_debiased.csv'), index=False)
+    return region
+
+
+@pytest.fixture
+def connection(tmp_path):
+    # The second region's folder has a quote in its path, which must not break the view definition
+    return utility_query.connect([
+        region_of(str(tmp_path / 'default'), utility_region.DEFAULT_REGION_NAME, 10.0),
+        region_of(str(tmp_path / "other's"), 'san_diego', 20.0)
+    ])
+
+
+@pytest.mark.parametrize('view_name', ['san_diego.prepared_04_debiased', '"san_diego"."prepared_04_debiased"'])
+def test_scan_non_default_region(connection, view_name):
+    table = utility_query.scan(view_name, ['year', 'homeless_individuals_count'], connection=connection)
+    assert table.column_names == ['year', 'homeless_individuals_count']
+    assert table.column('homeless_individuals_count').to_pylist() == [20.0, 21.0]
+
+
+def test_scan_default_region_without_schema(connection):
+    table = utility_query.scan('prepared_04_debiased', where='year = ?', connection=connection, parameters=[2021])
+    assert table.column('homeless_individuals_count').to_pylist() == [11.0]
+
+
+def test_scan_unknown_view(connection):
+    with pytest.raises(KeyError):
+        utility_query.scan('san_diego.prepared_01_merged', connection=connection)